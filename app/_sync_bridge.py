@@ -0,0 +1,77 @@
+"""Run coroutines from synchronous code on one long-lived event loop thread.
+
+CrewAI calls tools and the LLM wrapper synchronously from its worker thread.
+``asyncio.run`` would build and tear down a loop on every such call and fails
+outright when invoked from a thread that already runs a loop.
+"""
+
+import asyncio
+import threading
+from typing import Any, Callable, Coroutine, MutableMapping, Optional, TypeVar
+
+T = TypeVar("T")
+
+
+class _SyncRunner:
+    """Owns a daemon thread running an event loop, started on first use."""
+
+    def __init__(self) -> None:
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    def _ensure_loop(self) -> asyncio.AbstractEventLoop:
+        with self._lock:
+            if self._loop is None:
+                loop = asyncio.new_event_loop()
+                self._thread = threading.Thread(
+                    target=loop.run_forever, name="mera-sync-runner", daemon=True
+                )
+                self._thread.start()
+                self._loop = loop
+            return self._loop
+
+    def run(self, coro: Coroutine[Any, Any, T]) -> T:
+        loop = self._ensure_loop()
+        if threading.current_thread() is self._thread:
+            coro.close()
+            raise RuntimeError("run_coro() cannot be called from the bridge's own loop thread")
+        return asyncio.run_coroutine_threadsafe(coro, loop).result()
+
+
+_runner = _SyncRunner()
+
+
+def run_coro(coro: Coroutine[Any, Any, T]) -> T:
+    """Run ``coro`` to completion on the shared bridge loop and return its result.
+
+    Safe to call from threads that have their own running loop: the coroutine
+    executes on the bridge thread while the caller blocks on the result.
+    """
+    return _runner.run(coro)
+
+
+async def aclose_per_loop(
+    resources: MutableMapping[asyncio.AbstractEventLoop, T],
+    close: Callable[[T], Coroutine[Any, Any, Any]],
+) -> None:
+    """Close and forget every loop's entry in ``resources``, each on its own loop.
+
+    Per-loop clients exist for the serving loop and for the bridge loop; each
+    must be closed on the loop that created it. Entries for loops that are no
+    longer running are dropped, as nothing can close them any more.
+    """
+    current = asyncio.get_running_loop()
+    closing = []
+    for loop, resource in list(resources.items()):
+        del resources[loop]
+        if loop is current:
+            closing.append(close(resource))
+        elif loop.is_running():
+            closing.append(
+                asyncio.wrap_future(asyncio.run_coroutine_threadsafe(close(resource), loop))
+            )
+    await asyncio.gather(*closing, return_exceptions=True)
+
+
+__all__ = ["aclose_per_loop", "run_coro"]
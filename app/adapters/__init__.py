@@ -1,7 +1,27 @@
-"""Adapters for external services."""
+"""Adapters for external services.
 
-from app.adapters.chroma import ChromaMemoryAdapter
-from app.adapters.obsidian import ObsidianAdapter, ObsidianClient
-from app.adapters.openrouter import OpenRouterLLMAdapter
+Re-exports are resolved lazily so that importing one adapter module (e.g.
+``app.adapters.openrouter``) does not pull in chromadb and its transitive
+dependencies through this package.
+"""
+
+from importlib import import_module
+from typing import Any
+
+_EXPORTS = {
+    "ChromaMemoryAdapter": "app.adapters.chroma",
+    "ObsidianAdapter": "app.adapters.obsidian",
+    "ObsidianClient": "app.adapters.obsidian",
+    "OpenRouterLLMAdapter": "app.adapters.openrouter",
+}
 
 __all__ = ["ChromaMemoryAdapter", "ObsidianAdapter", "ObsidianClient", "OpenRouterLLMAdapter"]
+
+
+def __getattr__(name: str) -> Any:
+    module_name = _EXPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(import_module(module_name), name)
+    globals()[name] = value
+    return value
@@ -3,104 +3,515 @@
 import asyncio
 import hashlib
 import json
+import logging
 import os
-from typing import Any, Dict, List, Optional
+import time
+import weakref
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from functools import lru_cache, partial
+from typing import Any, Dict, List, Optional, Set
 from uuid import uuid4
 
 import chromadb
-import httpx
+import numpy as np
+import orjson
 from chromadb.config import Settings as ChromaSettings
 from aiocache import Cache
 from aiocache.serializers import JsonSerializer
 
+from app.adapters.openrouter import _build_headers, _get_async_client
 from app.core import Memory, UserID
 from app.config import get_settings
+from app.ttlcache import TTLCache
+
+logger = logging.getLogger(__name__)
+
+
+# HNSW parameters sized for per-user/per-space memory collections (well under
+# 100k vectors). These are fixed when a collection is created; changing them
+# requires rebuilding the collection.
+#
+# search_ef is the size of the candidate list kept while walking the graph:
+# lower values visit fewer nodes and answer faster at the cost of recall, higher
+# values approach exact top-k. It must be at least the largest ``limit`` callers
+# ask for (Chroma raises it to k otherwise); set via ``chroma_hnsw_search_ef``.
+@lru_cache(maxsize=1)
+def chroma_collection_metadata() -> Dict[str, Any]:
+    """Metadata for newly created memory collections, read from settings once."""
+    return {
+        "hnsw:space": "cosine",
+        "hnsw:M": 16,
+        "hnsw:construction_ef": 200,
+        "hnsw:search_ef": get_settings().chroma_hnsw_search_ef,
+        "hnsw:num_threads": os.cpu_count() or 1,
+    }
+
+
+# Chroma calls block (SQLite, HNSW, or HTTP for a remote server). They run on a
+# dedicated pool so they neither queue behind nor starve the default executor
+# that asyncio.to_thread shares with file I/O and CrewAI's worker threads.
+_chroma_executor = ThreadPoolExecutor(
+    max_workers=min(4, os.cpu_count() or 1), thread_name_prefix="chroma"
+)
+
+
+async def _run_chroma(fn: Any, *args: Any, **kwargs: Any) -> Any:
+    return await asyncio.get_running_loop().run_in_executor(
+        _chroma_executor, partial(fn, *args, **kwargs)
+    )
+
 
 # Cache setup
 _cache: Optional[Cache] = None
 
+
 async def _get_cache() -> Cache:
     global _cache
     if _cache is None:
         _cache = Cache(Cache.MEMORY, serializer=JsonSerializer(), namespace="mera_ai", timeout=None)
     return _cache
 
+
 def _make_key(prefix: str, *args: Any, **kwargs: Any) -> str:
     key_data = {"prefix": prefix, "args": args, "kwargs": sorted(kwargs.items()) if kwargs else {}}
     return hashlib.sha256(json.dumps(key_data, sort_keys=True, default=str).encode()).hexdigest()
 
-async def _get_cached(prefix: str, key_args: tuple, key_kwargs: Optional[Dict[str, Any]] = None) -> Optional[Any]:
+
+async def _get_cached(
+    prefix: str, key_args: tuple, key_kwargs: Optional[Dict[str, Any]] = None
+) -> Optional[Any]:
     try:
         cache = await _get_cache()
         return await cache.get(_make_key(prefix, *key_args, **(key_kwargs or {})))
     except Exception:
         return None
 
-async def _set_cached(prefix: str, key_args: tuple, value: Any, key_kwargs: Optional[Dict[str, Any]] = None, ttl: int = 3600) -> None:
+
+async def _set_cached(
+    prefix: str,
+    key_args: tuple,
+    value: Any,
+    key_kwargs: Optional[Dict[str, Any]] = None,
+    ttl: int = 3600,
+) -> None:
     try:
         cache = await _get_cache()
         await cache.set(_make_key(prefix, *key_args, **(key_kwargs or {})), value, ttl=ttl)
     except Exception:
         pass
 
+
 # Embeddings (inlined from infrastructure/embeddings.py)
-async def _get_embeddings(texts: List[str], model: str = "text-embedding-3-small") -> List[List[float]]:
-    import httpx
+@lru_cache(maxsize=1)
+def _embeddings_endpoint() -> tuple[str, Dict[str, str]]:
+    """URL and headers for the embeddings API, read from settings once."""
     settings = get_settings()
-    async with httpx.AsyncClient(timeout=60.0) as client:
-        url = settings.openrouter_base_url.rstrip("/") + "/embeddings"
-        headers = {"Authorization": f"Bearer {settings.openrouter_api_key}", "HTTP-Referer": "https://localhost", "X-Title": "Unified AI Assistant"}
-        payload = {"model": model, "input": texts}
-        response = await client.post(url, headers=headers, json=payload)
-        response.raise_for_status()
-        return [item["embedding"] for item in response.json()["data"]]
+    return settings.openrouter_base_url.rstrip("/") + "/embeddings", _build_headers(
+        settings.openrouter_api_key
+    )
+
+
+async def _get_embeddings(
+    texts: List[str], model: str = "text-embedding-3-small"
+) -> List[List[float]]:
+    # Same host as chat completions: share its pooled HTTP/2 client instead of
+    # opening a new connection per call.
+    client = await _get_async_client()
+    url, headers = _embeddings_endpoint()
+    payload = {"model": model, "input": texts}
+    response = await client.post(url, headers=headers, json=payload)
+    response.raise_for_status()
+    # Embedding responses are large arrays of floats, where orjson is markedly faster than json.
+    data = orjson.loads(response.content)["data"]
+    # Items carry the position of their input; don't rely on response order.
+    data.sort(key=lambda item: item.get("index", 0))
+    if len(data) != len(texts):
+        raise ValueError(f"Expected {len(texts)} embeddings, got {len(data)}")
+    return [item["embedding"] for item in data]
+
+
+class _EmbeddingBatcher:
+    """Coalesces concurrent single-text embedding requests into one API call.
+
+    Requests arriving within ``window`` seconds of each other (or until
+    ``max_batch`` accumulate) share a single embeddings round-trip.
+    """
+
+    def __init__(self, window: float = 0.005, max_batch: int = 64) -> None:
+        self._window = window
+        self._max_batch = max_batch
+        self._pending: List[tuple[str, "asyncio.Future[List[float]]"]] = []
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+        self._tasks: Set["asyncio.Task[None]"] = set()
+
+    async def embed(self, text: str) -> List[float]:
+        loop = asyncio.get_running_loop()
+        future: "asyncio.Future[List[float]]" = loop.create_future()
+        self._pending.append((text, future))
+        if len(self._pending) >= self._max_batch:
+            self._flush()
+        elif self._flush_handle is None:
+            self._flush_handle = loop.call_later(self._window, self._flush)
+        return await future
+
+    def _flush(self) -> None:
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        batch, self._pending = self._pending, []
+        if batch:
+            task = asyncio.ensure_future(self._embed_batch(batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _embed_batch(self, batch: List[tuple[str, "asyncio.Future[List[float]]"]]) -> None:
+        try:
+            embeddings = await _get_embeddings([text for text, _ in batch])
+            if len(embeddings) != len(batch):
+                raise ValueError(f"Expected {len(batch)} embeddings, got {len(embeddings)}")
+            for (_, future), embedding in zip(batch, embeddings, strict=True):
+                if not future.done():
+                    future.set_result(embedding)
+        except BaseException as e:
+            # Every caller must be woken, whatever went wrong, or it waits forever.
+            error = e if isinstance(e, Exception) else RuntimeError("Embedding batch was cancelled")
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(error)
+            if not isinstance(e, Exception):
+                raise
+
+
+# Futures and timers belong to the loop that created them, so each loop gets its own batcher.
+_batchers: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, _EmbeddingBatcher]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def _get_batcher() -> _EmbeddingBatcher:
+    loop = asyncio.get_running_loop()
+    batcher = _batchers.get(loop)
+    if batcher is None:
+        batcher = _batchers[loop] = _EmbeddingBatcher()
+    return batcher
+
+
+@dataclass
+class CacheStats:
+    hits: int = 0
+    misses: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+
+class _EmbeddingCache:
+    """In-process LRU+TTL cache of text embeddings.
+
+    Vectors are kept as Python lists rather than going through the JSON
+    serializer of the shared aiocache store, and concurrent misses for the
+    same text share one embedding request.
+    """
+
+    def __init__(self, maxsize: int = 4096, ttl: float = 3600.0, log_every: int = 1000) -> None:
+        self._maxsize = maxsize
+        self._ttl = ttl
+        self._log_every = log_every
+        self._entries: "OrderedDict[str, tuple[float, List[float]]]" = OrderedDict()
+        self._inflight: Dict[str, "asyncio.Task[List[float]]"] = {}
+        self.stats = CacheStats()
+
+    async def get(self, text: str) -> List[float]:
+        key = hashlib.sha1(text.encode()).hexdigest()
+        entry = self._entries.get(key)
+        if entry is not None and entry[0] > time.monotonic():
+            self._entries.move_to_end(key)
+            self._record(hit=True)
+            return entry[1]
+        self._record(hit=False)
+
+        loop = asyncio.get_running_loop()
+        task = self._inflight.get(key)
+        if task is None or task.get_loop() is not loop:
+            task = asyncio.ensure_future(self._embed(key, text))
+            self._inflight[key] = task
+            task.add_done_callback(partial(self._forget, key))
+        # Shielded so a cancelled caller does not cancel the embedding for the others.
+        return await asyncio.shield(task)
+
+    def _forget(self, key: str, task: "asyncio.Task[List[float]]") -> None:
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        if not task.cancelled():
+            # Mark it retrieved so a failure nobody else waited on is not logged as unhandled.
+            task.exception()
+
+    async def _embed(self, key: str, text: str) -> List[float]:
+        embedding = await _get_batcher().embed(text)
+        self._entries[key] = (time.monotonic() + self._ttl, embedding)
+        self._entries.move_to_end(key)
+        if len(self._entries) > self._maxsize:
+            self._entries.popitem(last=False)
+        return embedding
+
+    def _record(self, hit: bool) -> None:
+        if hit:
+            self.stats.hits += 1
+        else:
+            self.stats.misses += 1
+        if (self.stats.hits + self.stats.misses) % self._log_every == 0:
+            logger.debug(
+                f"Embedding cache: hits={self.stats.hits} misses={self.stats.misses} hit_rate={self.stats.hit_rate:.2%}"
+            )
+
+
+_embedding_cache = _EmbeddingCache()
+
+
+async def _embed_cached(text: str) -> List[float]:
+    """Embed ``text``, reusing the vector for repeated texts.
+
+    Only the embedding is cached; search results still come from Chroma.
+    """
+    return await _embedding_cache.get(text)
+
+
+# Process-local results in front of the aiocache store: a hit returns the stored
+# ``Memory`` objects directly, without key hashing, JSON round-trip or model rebuild.
+_search_results: "TTLCache[List[Memory]]" = TTLCache(maxsize=1024, ttl=300.0)
 
 
 class ChromaMemoryAdapter:
-    def __init__(self, host: Optional[str] = None, port: Optional[int] = None, collection_name: Optional[str] = None, persist_directory: Optional[str] = None) -> None:
+    # Upper bound on live per-user collection handles kept by one adapter.
+    MAX_USER_COLLECTIONS = 128
+
+    def __init__(
+        self,
+        host: Optional[str] = None,
+        port: Optional[int] = None,
+        collection_name: Optional[str] = None,
+        persist_directory: Optional[str] = None,
+        per_user_collections: Optional[bool] = None,
+    ) -> None:
         self.host = host or os.getenv("CHROMA_HOST")
         self.port = port or int(os.getenv("CHROMA_PORT", "8000"))
         self.collection_name = collection_name or os.getenv("CHROMA_COLLECTION_NAME", "memories")
         self.persist_directory = persist_directory or os.getenv("CHROMA_PERSIST_DIR", "./chroma_db")
+        if per_user_collections is None:
+            per_user_collections = get_settings().chroma_per_user_collections
+        self.per_user_collections = per_user_collections
         if self.host:
             self._client = chromadb.HttpClient(host=self.host, port=self.port)
         else:
-            self._client = chromadb.PersistentClient(path=self.persist_directory, settings=ChromaSettings(anonymized_telemetry=False))
+            self._client = chromadb.PersistentClient(
+                path=self.persist_directory, settings=ChromaSettings(anonymized_telemetry=False)
+            )
         self._collection = None
+        self._user_collections: "OrderedDict[str, Any]" = OrderedDict()
+        # Keyed by (event loop, search key): tasks can only be awaited on the loop
+        # that created them, and searches run on both the API and sync-bridge loops.
+        self._search_inflight: Dict[tuple, "asyncio.Task[List[Memory]]"] = {}
+        # Collections known to hold vectors; only the others are counted before a search.
+        self._non_empty: Set[str] = set()
 
-    def _get_collection(self):
+    def _get_collection(self, user_id: Optional[UserID] = None):
+        """Return the collection holding ``user_id``'s memories.
+
+        With per-user collections each user's vectors live in their own HNSW
+        index, so searches neither traverse other users' vectors nor need a
+        ``user_id`` metadata filter.
+        """
+        if self.per_user_collections and user_id is not None:
+            name = f"{self.collection_name}_{hashlib.blake2b(user_id.encode(), digest_size=8).hexdigest()}"
+            collection = self._user_collections.get(name)
+            if collection is None:
+                collection = self._client.get_or_create_collection(
+                    name=name, metadata=chroma_collection_metadata()
+                )
+                self._user_collections[name] = collection
+                if len(self._user_collections) > self.MAX_USER_COLLECTIONS:
+                    self._user_collections.popitem(last=False)
+            else:
+                self._user_collections.move_to_end(name)
+            return collection
         if self._collection is None:
-            self._collection = self._client.get_or_create_collection(name=self.collection_name, metadata={"hnsw:space": "cosine"})
+            self._collection = self._client.get_or_create_collection(
+                name=self.collection_name, metadata=chroma_collection_metadata()
+            )
         return self._collection
 
     async def store(self, user_id: UserID, text: str, metadata: Optional[dict] = None) -> None:
-        embeddings = await _get_embeddings([text])
+        # Concurrent stores share one embeddings call via the batcher. Document
+        # vectors bypass the cache, which is for repeated queries.
+        embedding = await _get_batcher().embed(text)
         chroma_metadata = {"user_id": user_id, **(metadata or {})}
         memory_id = str(uuid4())
-        collection = self._get_collection()
-        await asyncio.to_thread(collection.add, ids=[memory_id], embeddings=[embeddings[0]], documents=[text], metadatas=[chroma_metadata])
+        collection = self._get_collection(user_id)
+        await _run_chroma(
+            collection.add,
+            ids=[memory_id],
+            embeddings=[embedding],
+            documents=[text],
+            metadatas=[chroma_metadata],
+        )
+        self._non_empty.add(collection.name)
+
+    async def store_batch(
+        self, user_id: UserID, texts: List[str], metadatas: Optional[List[Optional[dict]]] = None
+    ) -> None:
+        """Store several memories with one embeddings call and one collection write."""
+        if not texts:
+            return
+        embeddings = await _get_embeddings(texts)
+        chroma_metadatas = [
+            {"user_id": user_id, **(metadata or {})}
+            for metadata in (metadatas or [None] * len(texts))
+        ]
+        collection = self._get_collection(user_id)
+        await _run_chroma(
+            collection.add,
+            ids=[str(uuid4()) for _ in texts],
+            embeddings=embeddings,
+            documents=texts,
+            metadatas=chroma_metadatas,
+        )
+        self._non_empty.add(collection.name)
+
+    def _where(
+        self, user_id: UserID, where: Optional[Dict[str, Any]] = None
+    ) -> Optional[Dict[str, Any]]:
+        """Chroma filter for ``user_id``'s rows, combined with an optional extra filter."""
+        if self.per_user_collections:
+            return where
+        return {"$and": [{"user_id": user_id}, where]} if where else {"user_id": user_id}
+
+    async def list_memories(
+        self, user_id: UserID, limit: int = 50, where: Optional[Dict[str, Any]] = None
+    ) -> List[Memory]:
+        """Return up to ``limit`` of a user's memories, unranked and in no particular order.
 
-    async def search(self, user_id: UserID, query: str, limit: int = 5) -> List[Memory]:
-        cache_key = (user_id, query, limit)
-        cached_result = await _get_cached("chroma_search", cache_key)
+        This is a metadata-only ``get``: no query embedding and no HNSW
+        traversal. Chroma does not order ``get`` results, so this is a sample
+        of the user's memories, not the most recent ones. Results are cached
+        briefly so repeated dumps coalesce.
+        """
+        cache_key = (self.collection_name, user_id, limit)
+        cache_kwargs = {"where": where} if where else None
+        cached_result = await _get_cached("chroma_list", cache_key, cache_kwargs)
         if cached_result is not None:
-            if isinstance(cached_result, list):
-                return [Memory(**item) if isinstance(item, dict) else item for item in cached_result]
-            return cached_result
-        
-        query_embeddings = await _get_embeddings([query])
-        collection = self._get_collection()
-        results = await asyncio.to_thread(collection.query, query_embeddings=[query_embeddings[0]], n_results=limit, where={"user_id": user_id})
-        
+            return [Memory(**item) for item in cached_result]
+
+        collection = self._get_collection(user_id)
+        results = await _run_chroma(
+            collection.get,
+            where=self._where(user_id, where),
+            limit=limit,
+            include=["documents", "metadatas"],
+        )
+        documents = results["documents"] or []
+        metadatas = results["metadatas"] or [{}] * len(documents)
+        memories = [
+            Memory(text=text, metadata=metadata or {})
+            for text, metadata in zip(documents, metadatas)
+        ]
+
+        cache_data = [{"text": m.text, "metadata": m.metadata, "score": m.score} for m in memories]
+        await _set_cached("chroma_list", cache_key, cache_data, cache_kwargs, ttl=60)
+        return memories
+
+    async def search(
+        self, user_id: UserID, query: str, limit: int = 5, where: Optional[Dict[str, Any]] = None
+    ) -> List[Memory]:
+        """Semantic search over a user's memories.
+
+        ``where`` is an optional Chroma metadata filter combined with the user
+        filter, so narrowing happens inside the ANN query rather than by
+        over-fetching and filtering the hits in Python.
+        """
+        if query.strip() in ("", "*"):
+            # "Everything" queries have nothing to rank by.
+            return await self.list_memories(user_id, limit, where=where)
+        key = (
+            self.collection_name,
+            user_id,
+            query,
+            limit,
+            orjson.dumps(where, option=orjson.OPT_SORT_KEYS) if where else None,
+        )
+        local = _search_results.get(key)
+        if local is not None:
+            return list(local)
+        cache_key = (self.collection_name, user_id, query, limit)
+        cache_kwargs = {"where": where} if where else None
+        cached_result = await _get_cached("chroma_search", cache_key, cache_kwargs)
+        if cached_result is not None:
+            memories = [
+                Memory(**item) if isinstance(item, dict) else item for item in cached_result
+            ]
+            _search_results.put(key, memories)
+            return list(memories)
+
+        # Identical searches already running share one embed + ANN query instead
+        # of each paying for it before the first one has populated the cache.
+        inflight_key = (asyncio.get_running_loop(), key)
+        task = self._search_inflight.get(inflight_key)
+        if task is None:
+            task = asyncio.ensure_future(
+                self._search(user_id, query, limit, where, key, cache_key, cache_kwargs)
+            )
+            self._search_inflight[inflight_key] = task
+            task.add_done_callback(lambda _: self._search_inflight.pop(inflight_key, None))
+        # Shielded so one caller being cancelled does not cancel the search for the others.
+        return list(await asyncio.shield(task))
+
+    async def _search(
+        self,
+        user_id: UserID,
+        query: str,
+        limit: int,
+        where: Optional[Dict[str, Any]],
+        key: tuple,
+        cache_key: tuple,
+        cache_kwargs: Optional[Dict[str, Any]],
+    ) -> List[Memory]:
+        collection = self._get_collection(user_id)
+        # Skip the embedding round-trip when there is nothing to search. Once a
+        # collection is seen non-empty it is not counted again (memories are never deleted).
+        if collection.name not in self._non_empty:
+            if await _run_chroma(collection.count) == 0:
+                return []
+            self._non_empty.add(collection.name)
+
         memories: List[Memory] = []
-        if results["ids"] and len(results["ids"][0]) > 0:
-            for i in range(len(results["ids"][0])):
-                memories.append(Memory(
-                    text=results["documents"][0][i] if results["documents"] else "",
-                    metadata=results["metadatas"][0][i] if results["metadatas"] else {},
-                    score=1.0 - results["distances"][0][i] if results["distances"] else 0.0,
-                ))
-        
+        query_embedding = await _embed_cached(query)
+        results = await _run_chroma(
+            collection.query,
+            query_embeddings=[query_embedding],
+            n_results=limit,
+            where=self._where(user_id, where),
+        )
+        ids = results["ids"][0] if results["ids"] else []
+        if ids:
+            n = len(ids)
+            documents = results["documents"][0] if results["documents"] else [""] * n
+            metadatas = results["metadatas"][0] if results["metadatas"] else [{}] * n
+            # One vectorized subtraction instead of per-hit float boxing; float64 keeps the
+            # scores identical to the previous Python arithmetic.
+            scores = (
+                (1.0 - np.asarray(results["distances"][0], dtype=np.float64)).tolist()
+                if results["distances"]
+                else [0.0] * n
+            )
+            memories = [
+                Memory(text=text, metadata=metadata, score=score)
+                for text, metadata, score in zip(documents, metadatas, scores)
+            ]
+
         cache_data = [{"text": m.text, "metadata": m.metadata, "score": m.score} for m in memories]
-        await _set_cached("chroma_search", cache_key, cache_data, ttl=1800)
+        await _set_cached("chroma_search", cache_key, cache_data, cache_kwargs, ttl=1800)
+        _search_results.put(key, memories)
         return memories
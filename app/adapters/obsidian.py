@@ -1,15 +1,19 @@
 """Obsidian integration via Local REST API plugin."""
 
+import asyncio
 import hashlib
 import json
 import logging
+import weakref
 from dataclasses import dataclass
 from typing import Any, Dict, List, Optional
 
 import httpx
+import orjson
 from aiocache import Cache
 from aiocache.serializers import JsonSerializer
 
+from app._sync_bridge import aclose_per_loop
 from app.config import get_settings
 
 logger = logging.getLogger(__name__)
@@ -17,16 +21,19 @@ logger = logging.getLogger(__name__)
 # Cache setup (inlined)
 _cache: Optional[Cache] = None
 
+
 async def _get_cache() -> Cache:
     global _cache
     if _cache is None:
         _cache = Cache(Cache.MEMORY, serializer=JsonSerializer(), namespace="mera_ai", timeout=None)
     return _cache
 
+
 def _make_key(prefix: str, *args: Any, **kwargs: Any) -> str:
     key_data = {"prefix": prefix, "args": args, "kwargs": sorted(kwargs.items()) if kwargs else {}}
     return hashlib.sha256(json.dumps(key_data, sort_keys=True, default=str).encode()).hexdigest()
 
+
 async def _get_cached(prefix: str, key_args: tuple) -> Optional[Any]:
     try:
         cache = await _get_cache()
@@ -34,6 +41,7 @@ async def _get_cached(prefix: str, key_args: tuple) -> Optional[Any]:
     except Exception:
         return None
 
+
 async def _set_cached(prefix: str, key_args: tuple, value: Any, ttl: int = 1800) -> None:
     try:
         cache = await _get_cache()
@@ -42,71 +50,115 @@ async def _set_cached(prefix: str, key_args: tuple, value: Any, ttl: int = 1800)
         pass
 
 
+# Notes change while the user works in the vault, so search hits are kept briefly.
+_SEARCH_CACHE_TTL = 300
+
+# One pooled client per event loop, shared by every ObsidianAdapter: adapters
+# are created per space, and a client per instance would reconnect each time.
+_async_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, httpx.AsyncClient]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+async def _get_async_client() -> httpx.AsyncClient:
+    loop = asyncio.get_running_loop()
+    client = _async_clients.get(loop)
+    if client is None:
+        # Idle connections are kept for 75s rather than httpx's default 5s, so
+        # searches a few seconds apart reuse the connection; the short connect
+        # timeout fails fast when the plugin is not running.
+        client = httpx.AsyncClient(
+            timeout=httpx.Timeout(5.0, connect=2.0),
+            limits=httpx.Limits(
+                max_keepalive_connections=100, max_connections=200, keepalive_expiry=75.0
+            ),
+        )
+        _async_clients[loop] = client
+    return client
+
+
+async def _close_async_client() -> None:
+    await aclose_per_loop(_async_clients, lambda client: client.aclose())
+
+
 @dataclass
 class ObsidianAdapter:
     """Obsidian integration via Local REST API plugin with async support."""
+
     base_url: str
     token: Optional[str] = None
     vault_path: Optional[str] = None
-    _client: Optional[httpx.AsyncClient] = None
 
-    def __init__(self, base_url: Optional[str] = None, token: Optional[str] = None, vault_path: Optional[str] = None) -> None:
+    def __init__(
+        self,
+        base_url: Optional[str] = None,
+        token: Optional[str] = None,
+        vault_path: Optional[str] = None,
+    ) -> None:
         settings = get_settings()
         self.base_url = base_url or settings.obsidian_rest_url or "http://localhost:27124"
         self.token = token or settings.obsidian_rest_token
         self.vault_path = vault_path or settings.obsidian_vault_path
-        self._client = None
+        # Bodies are encoded with orjson and sent as raw content, so the type is set here.
+        self._headers = {"Content-Type": "application/json"}
+        if self.token:
+            self._headers["Authorization"] = f"Bearer {self.token}"
 
     async def _get_client(self) -> httpx.AsyncClient:
-        if self._client is None:
-            self._client = httpx.AsyncClient(timeout=5.0, limits=httpx.Limits(max_keepalive_connections=10, max_connections=50))
-        return self._client
+        return await _get_async_client()
 
     async def close(self) -> None:
-        if self._client is not None:
-            await self._client.aclose()
-            self._client = None
+        """Kept for API compatibility: the pooled client is shared and closed at shutdown."""
 
     async def create_note(self, title: str, content: str, tags: Optional[List[str]] = None) -> None:
-        headers = {}
-        if self.token:
-            headers["Authorization"] = f"Bearer {self.token}"
         filename = title.replace("/", "-").replace("\\", "-").strip()
         if not filename.endswith(".md"):
             filename += ".md"
         if tags:
-            content = " ".join([f"#{tag}" for tag in tags]) + "\n\n" + content
+            tags_line = " ".join(f"#{tag}" for tag in tags)
+            content = f"{tags_line}\n\n{content}"
         try:
             client = await self._get_client()
             payload = {"path": filename, "content": content}
             if self.vault_path:
                 payload["vault"] = self.vault_path
-            response = await client.post(f"{self.base_url}/vault/create", headers=headers, json=payload)
+            response = await client.post(
+                f"{self.base_url}/vault/create",
+                headers=self._headers,
+                content=orjson.dumps(payload),
+            )
             response.raise_for_status()
         except (httpx.RequestError, httpx.HTTPStatusError) as e:
             logger.warning(f"Obsidian API error (create_note): {e}")
 
     async def search(self, query: str, limit: int = 5) -> List[Dict[str, Any]]:
-        cache_key = (query, limit)
+        # Scoped to the server and vault (spaces use different vaults), and keyed on the
+        # normalized query since Obsidian search ignores case and extra whitespace.
+        cache_key = (self.base_url, self.vault_path, " ".join(query.lower().split()), limit)
         cached_result = await _get_cached("obsidian_search", cache_key)
         if cached_result is not None:
             return cached_result
-        
-        headers = {}
-        if self.token:
-            headers["Authorization"] = f"Bearer {self.token}"
+
         try:
             client = await self._get_client()
             payload = {"query": query, "limit": limit}
             if self.vault_path:
                 payload["vault"] = self.vault_path
-            response = await client.post(f"{self.base_url}/vault/search", headers=headers, json=payload)
+            response = await client.post(
+                f"{self.base_url}/vault/search",
+                headers=self._headers,
+                content=orjson.dumps(payload),
+            )
             response.raise_for_status()
-            results = response.json()
-            final_results = results if isinstance(results, list) else (results.get("results", []) if isinstance(results, dict) else [])
-            await _set_cached("obsidian_search", cache_key, final_results, ttl=1800)
+            results = orjson.loads(response.content)
+            final_results = (
+                results
+                if isinstance(results, list)
+                else (results.get("results", []) if isinstance(results, dict) else [])
+            )
+            await _set_cached("obsidian_search", cache_key, final_results, ttl=_SEARCH_CACHE_TTL)
             return final_results
-        except (httpx.RequestError, httpx.HTTPStatusError) as e:
+        except (httpx.RequestError, httpx.HTTPStatusError, orjson.JSONDecodeError) as e:
             logger.warning(f"Obsidian API error (search): {e}")
             return []
 
@@ -1,33 +1,84 @@
 """OpenRouter LLM adapter."""
 
 import asyncio
-import time
-from typing import List, Optional
+import hashlib
+import weakref
+from typing import Any, AsyncIterator, List, Optional
 
 import httpx
+import orjson
 
+from app._sync_bridge import aclose_per_loop
 from app.core import LLMMessage, LLMResponse
 from app.config import get_settings
+from app.ratelimit import AsyncTokenBucket
+from app.ttlcache import TTLCache
+
+# Completions for byte-identical requests, bounded in count and age so the
+# cache cannot grow with traffic.
+_completions: "TTLCache[dict[str, Any]]" = TTLCache(maxsize=512, ttl=3600.0)
+
+
+def _completion_key(payload: dict[str, Any]) -> str:
+    return hashlib.sha256(orjson.dumps(payload, option=orjson.OPT_SORT_KEYS)).hexdigest()
 
 
 def _build_headers(api_key: str) -> dict[str, str]:
-    return {"Authorization": f"Bearer {api_key}", "HTTP-Referer": "https://localhost", "X-Title": "Unified AI Assistant"}
+    return {
+        "Authorization": f"Bearer {api_key}",
+        "HTTP-Referer": "https://localhost",
+        "X-Title": "Unified AI Assistant",
+    }
+
+
+# One pooled client per event loop: an httpx.AsyncClient's connections are bound
+# to the loop that opened them, and the LLM is called both from the API loop
+# and from CrewAI's worker thread.
+_async_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, httpx.AsyncClient]" = (
+    weakref.WeakKeyDictionary()
+)
+# Per-model client-side rate limit: bursts of up to _RATE_LIMIT_BURST calls,
+# refilling at _RATE_LIMIT_PER_SEC (the previous fixed 100ms spacing, on average).
+_RATE_LIMIT_PER_SEC: float = 10.0
+_RATE_LIMIT_BURST: int = 10
+_RETRY_AFTER_CAP: float = 30.0
+_buckets: dict[str, AsyncTokenBucket] = {}
+
+
+def _bucket_for(model: str) -> AsyncTokenBucket:
+    bucket = _buckets.get(model)
+    if bucket is None:
+        bucket = _buckets[model] = AsyncTokenBucket(_RATE_LIMIT_PER_SEC, _RATE_LIMIT_BURST)
+    return bucket
+
+
+def _retry_after(response: httpx.Response) -> Optional[float]:
+    """Seconds requested by a Retry-After header, capped; None if absent or not numeric."""
+    try:
+        return min(max(float(response.headers["retry-after"]), 0.0), _RETRY_AFTER_CAP)
+    except (KeyError, ValueError):
+        return None
 
-_async_client: Optional[httpx.AsyncClient] = None
-_last_request_time: dict[str, float] = {}
-_min_request_interval: float = 0.1
 
 async def _get_async_client() -> httpx.AsyncClient:
-    global _async_client
-    if _async_client is None:
-        _async_client = httpx.AsyncClient(timeout=60.0, limits=httpx.Limits(max_keepalive_connections=20, max_connections=100))
-    return _async_client
+    loop = asyncio.get_running_loop()
+    client = _async_clients.get(loop)
+    if client is None:
+        # HTTP/2 multiplexes concurrent completions over one connection; the long
+        # keepalive avoids re-handshaking between bursts of agent calls.
+        client = httpx.AsyncClient(
+            http2=True,
+            timeout=httpx.Timeout(60.0, connect=5.0),
+            limits=httpx.Limits(
+                max_keepalive_connections=100, max_connections=200, keepalive_expiry=60.0
+            ),
+        )
+        _async_clients[loop] = client
+    return client
+
 
 async def _close_async_client() -> None:
-    global _async_client
-    if _async_client is not None:
-        await _async_client.aclose()
-        _async_client = None
+    await aclose_per_loop(_async_clients, lambda client: client.aclose())
 
 
 class OpenRouterLLMAdapter:
@@ -36,44 +87,124 @@ class OpenRouterLLMAdapter:
         self.api_key = api_key or settings.openrouter_api_key
         self.base_url = (base_url or settings.openrouter_base_url).rstrip("/")
         self.url = f"{self.base_url}/chat/completions"
+        self._headers = _build_headers(self.api_key)
+        self.cache_enabled = settings.llm_cache_enabled
+        # Keyed by (event loop, request key): a task can only be awaited on its own
+        # loop, and chat is called from both the API loop and the sync bridge.
+        self._inflight: dict[
+            tuple[asyncio.AbstractEventLoop, str], "asyncio.Task[LLMResponse]"
+        ] = {}
 
-    async def chat(self, messages: List[LLMMessage], model: str, max_retries: int = 3, retry_delay: float = 1.0, **kwargs) -> LLMResponse:
+    async def chat(
+        self,
+        messages: List[LLMMessage],
+        model: str,
+        max_retries: int = 3,
+        retry_delay: float = 1.0,
+        **kwargs,
+    ) -> LLMResponse:
+        payload = {
+            "model": model,
+            "messages": [{"role": msg.role, "content": msg.content} for msg in messages],
+            **kwargs,
+        }
+        # Identical requests (retries, re-runs of the same workflow step) reuse
+        # the previous completion instead of paying for another LLM round-trip.
+        if self.cache_enabled:
+            cache_key = _completion_key(payload)
+            cached = _completions.get(cache_key)
+            if cached is not None:
+                return LLMResponse(
+                    content=cached["content"],
+                    model=model,
+                    metadata={"cached": True, "usage": cached.get("usage", {})},
+                )
+            # With caching on, an identical request already in flight is shared
+            # rather than sent twice while the first is still waiting on the API.
+            key = (asyncio.get_running_loop(), cache_key)
+            task = self._inflight.get(key)
+            if task is None:
+                task = asyncio.ensure_future(
+                    self._post_chat(payload, model, cache_key, max_retries, retry_delay)
+                )
+                self._inflight[key] = task
+                task.add_done_callback(lambda _: self._inflight.pop(key, None))
+            return await asyncio.shield(task)
+        return await self._post_chat(payload, model, None, max_retries, retry_delay)
+
+    async def _post_chat(
+        self,
+        payload: dict[str, Any],
+        model: str,
+        cache_key: Optional[str],
+        max_retries: int,
+        retry_delay: float,
+    ) -> LLMResponse:
         client = await _get_async_client()
-        global _last_request_time
-        last_time = _last_request_time.get(model, 0)
-        elapsed = time.time() - last_time
-        if elapsed < _min_request_interval:
-            await asyncio.sleep(_min_request_interval - elapsed)
-        _last_request_time[model] = time.time()
-        
-        payload = {"model": model, "messages": [{"role": msg.role, "content": msg.content} for msg in messages], **kwargs}
         last_exception = None
         for attempt in range(max_retries):
+            await _bucket_for(model).acquire()
             try:
-                response = await client.post(self.url, headers=_build_headers(self.api_key), json=payload)
+                response = await client.post(self.url, headers=self._headers, json=payload)
                 response.raise_for_status()
-                data = response.json()
+                data = orjson.loads(response.content)
+                content = data["choices"][0]["message"]["content"]
+                usage = data.get("usage", {})
+                if cache_key is not None:
+                    _completions.put(cache_key, {"content": content, "usage": usage})
                 return LLMResponse(
-                    content=data["choices"][0]["message"]["content"],
+                    content=content,
                     model=model,
-                    metadata={"attempt": attempt + 1, "usage": data.get("usage", {})},
+                    metadata={"attempt": attempt + 1, "usage": usage},
                 )
             except httpx.HTTPStatusError as e:
-                if e.response.status_code < 500:
+                status_code = e.response.status_code
+                if status_code < 500 and status_code != 429:
                     raise
                 last_exception = e
                 if attempt < max_retries - 1:
-                    await asyncio.sleep(retry_delay * (2 ** attempt))
+                    delay = _retry_after(e.response) if status_code == 429 else None
+                    await asyncio.sleep(retry_delay * (2**attempt) if delay is None else delay)
             except (httpx.RequestError, httpx.TimeoutException) as e:
                 last_exception = e
                 if attempt < max_retries - 1:
-                    await asyncio.sleep(retry_delay * (2 ** attempt))
+                    await asyncio.sleep(retry_delay * (2**attempt))
             except Exception:
                 raise
-        
+
         if last_exception:
             raise last_exception
         raise RuntimeError("Failed to get response after retries")
 
+    async def stream_chat(
+        self, messages: List[LLMMessage], model: str, **kwargs
+    ) -> AsyncIterator[str]:
+        """Yield completion text as OpenRouter streams it (server-sent events).
+
+        Streamed completions bypass the response cache and are not retried once
+        tokens have started flowing.
+        """
+        payload = {
+            "model": model,
+            "messages": [{"role": msg.role, "content": msg.content} for msg in messages],
+            **kwargs,
+            "stream": True,
+        }
+        client = await _get_async_client()
+        await _bucket_for(model).acquire()
+        async with client.stream("POST", self.url, headers=self._headers, json=payload) as response:
+            response.raise_for_status()
+            async for line in response.aiter_lines():
+                # Blank lines separate events; lines starting with ":" are keep-alive comments.
+                if not line.startswith("data: "):
+                    continue
+                data = line[6:]
+                if data == "[DONE]":
+                    break
+                choices = orjson.loads(data).get("choices") or [{}]
+                content = choices[0].get("delta", {}).get("content")
+                if content:
+                    yield content
+
 
 __all__ = ["OpenRouterLLMAdapter", "_close_async_client", "_get_async_client"]
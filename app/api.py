@@ -1,4 +1,4 @@
-import json
+import asyncio
 import logging
 from typing import Any, Dict, List, Optional
 
@@ -6,7 +6,8 @@ from fastapi import Depends, FastAPI, HTTPException, Request
 from fastapi import status
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.exceptions import RequestValidationError
-from fastapi.responses import JSONResponse, StreamingResponse
+from fastapi.responses import JSONResponse, ORJSONResponse, StreamingResponse
+import orjson
 from pydantic import BaseModel, Field
 from sqlalchemy.exc import OperationalError
 from sqlalchemy.ext.asyncio import AsyncSession
@@ -15,15 +16,24 @@ from app.core import ContextSource
 from app.db import Base, engine, get_db
 from app.config import get_settings
 from app.observability import is_langsmith_enabled
-from app.orchestrator import CrewAIOrchestrator
+from app.memory_factory import get_memory_manager, get_memory_manager_for_space
+from app.orchestrator import CrewAIOrchestrator, _space_bundle
+from app.adapters.obsidian import _close_async_client as _close_obsidian_client
 from app.adapters.openrouter import _close_async_client
+from app.multi_agent_context_system import _close_url_client, _dispose_engines
 from app.spaces import SpaceConfig, SpaceManager, SpaceStatus, SpaceUsage
+
 # Import models to ensure they're registered with SQLAlchemy Base
 from app.models import SpaceRecord, SpaceUsageRecord  # noqa: F401
 
 logger = logging.getLogger(__name__)
 
 
+def _sse(event: Dict[str, Any]) -> bytes:
+    """Encode one server-sent event; orjson writes the bytes directly."""
+    return b"data: " + orjson.dumps(event, option=orjson.OPT_NON_STR_KEYS) + b"\n\n"
+
+
 class ChatRequest(BaseModel):
     user_id: str
     query: str
@@ -92,8 +102,9 @@ def create_app() -> FastAPI:
     app = FastAPI(
         title="Unified AI Assistant",
         description="A unified AI assistant with persistent memory, context management, and multi-agent orchestration.",
+        default_response_class=ORJSONResponse,
     )
-    
+
     # Add CORS middleware to handle OPTIONS requests
     settings = get_settings()
     # Allow CORS origins from environment or default to all for development
@@ -106,7 +117,7 @@ def create_app() -> FastAPI:
         # Note: Cannot use ["*"] with allow_credentials=True, so we disable credentials
         allow_origins = ["*"]
         allow_credentials = False
-    
+
     app.add_middleware(
         CORSMiddleware,
         allow_origins=allow_origins,
@@ -114,19 +125,21 @@ def create_app() -> FastAPI:
         allow_methods=["*"],  # Allows all methods including OPTIONS
         allow_headers=["*"],
     )
-    
+
     @app.exception_handler(RequestValidationError)
-    async def validation_exception_handler(request: Request, exc: RequestValidationError) -> JSONResponse:
+    async def validation_exception_handler(
+        request: Request, exc: RequestValidationError
+    ) -> JSONResponse:
         return JSONResponse(status_code=422, content={"detail": exc.errors()})
-    
+
     if is_langsmith_enabled():
         logger.info("LangSmith observability enabled")
     else:
         logger.info("LangSmith observability disabled (keys not configured)")
-    
+
     logger.info("Using CrewAI unified orchestrator")
     orchestrator = CrewAIOrchestrator()
-    
+
     database_connected = False
     database_error = None
 
@@ -137,6 +150,7 @@ def create_app() -> FastAPI:
             async with engine.begin() as conn:
                 await conn.run_sync(Base.metadata.create_all)
                 from sqlalchemy import text
+
                 await conn.execute(text("SELECT 1"))
             database_connected = True
             database_error = None
@@ -151,7 +165,13 @@ def create_app() -> FastAPI:
 
     @app.on_event("shutdown")
     async def shutdown_event() -> None:
+        await orchestrator.aclose()
         await _close_async_client()
+        await _close_obsidian_client()
+        await _close_url_client()
+        await _dispose_engines()
+        get_memory_manager.cache_clear()
+        _space_bundle.cache_clear()
 
     @app.get("/status", response_model=StatusResponse)
     async def status() -> StatusResponse:
@@ -159,15 +179,21 @@ def create_app() -> FastAPI:
         db_display = "configured"
         if current_settings.database_url and "@" in current_settings.database_url:
             db_display = current_settings.database_url.split("@")[-1]
-        
-        chroma_status = "✓ Configured" if current_settings.chroma_host or True else "✗ Not configured"
-        
+
+        chroma_status = (
+            "✓ Configured" if current_settings.chroma_host or True else "✗ Not configured"
+        )
+
         return StatusResponse(
             status="operational",
             required_api_keys={
-                "OPENROUTER_API_KEY": "✓ Set" if current_settings.openrouter_api_key else "✗ Missing",
+                "OPENROUTER_API_KEY": "✓ Set"
+                if current_settings.openrouter_api_key
+                else "✗ Missing",
                 "CHROMA": chroma_status,
-                "DATABASE_URL": f"✓ Set ({db_display})" if current_settings.database_url else "✗ Missing",
+                "DATABASE_URL": f"✓ Set ({db_display})"
+                if current_settings.database_url
+                else "✗ Missing",
             },
             database_connected=database_connected,
             database_error=database_error,
@@ -182,13 +208,13 @@ def create_app() -> FastAPI:
         if not database_connected:
             raise HTTPException(
                 status_code=503,
-                detail="Database is not connected. Please check your DATABASE_URL configuration."
+                detail="Database is not connected. Please check your DATABASE_URL configuration.",
             )
-        
+
         context_sources = None
         if request.context_sources:
             context_sources = [ContextSource(**cs) for cs in request.context_sources]
-        
+
         # Initialize space manager if space_id provided
         space_manager = None
         if request.space_id:
@@ -197,7 +223,7 @@ def create_app() -> FastAPI:
                 await space_manager.switch_space(request.space_id)
             except ValueError as e:
                 raise HTTPException(status_code=404, detail=str(e))
-        
+
         result = await orchestrator.process_query(
             user_id=request.user_id,
             query=request.query,
@@ -216,19 +242,13 @@ def create_app() -> FastAPI:
 
     @app.post("/mem0/add")
     async def add_memory(request: AddMemoryRequest) -> Dict[str, str]:
-        from app.adapters.chroma import ChromaMemoryAdapter
-        from app.config import get_settings
         try:
-            settings = get_settings()
-            memory = ChromaMemoryAdapter(
-                host=settings.chroma_host,
-                port=settings.chroma_port,
-                collection_name=settings.chroma_collection_name,
-                persist_directory=settings.chroma_persist_dir,
-            )
+            memory = get_memory_manager()
             await memory.store(
                 user_id=request.user_id,
-                text=request.messages if isinstance(request.messages, str) else str(request.messages),
+                text=request.messages
+                if isinstance(request.messages, str)
+                else str(request.messages),
                 metadata=request.metadata,
             )
             return {"status": "success", "message": "Memory added"}
@@ -237,16 +257,8 @@ def create_app() -> FastAPI:
 
     @app.post("/mem0/search")
     async def search_memories(request: SearchMemoryRequest) -> Dict[str, Any]:
-        from app.adapters.chroma import ChromaMemoryAdapter
-        from app.config import get_settings
         try:
-            settings = get_settings()
-            memory = ChromaMemoryAdapter(
-                host=settings.chroma_host,
-                port=settings.chroma_port,
-                collection_name=settings.chroma_collection_name,
-                persist_directory=settings.chroma_persist_dir,
-            )
+            memory = get_memory_manager()
             memories = await memory.search(
                 user_id=request.user_id,
                 query=request.query,
@@ -259,21 +271,9 @@ def create_app() -> FastAPI:
 
     @app.get("/mem0/get_all/{user_id}")
     async def get_all_memories(user_id: str, limit: int = 100) -> Dict[str, Any]:
-        from app.adapters.chroma import ChromaMemoryAdapter
-        from app.config import get_settings
         try:
-            settings = get_settings()
-            memory = ChromaMemoryAdapter(
-                host=settings.chroma_host,
-                port=settings.chroma_port,
-                collection_name=settings.chroma_collection_name,
-                persist_directory=settings.chroma_persist_dir,
-            )
-            memories = await memory.search(
-                user_id=user_id,
-                query="",
-                limit=limit,
-            )
+            memory = get_memory_manager()
+            memories = await memory.list_memories(user_id=user_id, limit=limit)
             results = [{"text": m.text, "metadata": m.metadata, "score": m.score} for m in memories]
             return {"status": "success", "results": results}
         except Exception as e:
@@ -289,9 +289,9 @@ def create_app() -> FastAPI:
         if not database_connected:
             raise HTTPException(
                 status_code=503,
-                detail="Database is not connected. Please check your DATABASE_URL configuration."
+                detail="Database is not connected. Please check your DATABASE_URL configuration.",
             )
-        
+
         space_manager = SpaceManager(db)
         config = SpaceConfig(
             space_id=request.space_id,
@@ -301,7 +301,7 @@ def create_app() -> FastAPI:
             monthly_api_calls=request.monthly_api_calls,
             preferred_model=request.preferred_model,
         )
-        
+
         try:
             created_config = await space_manager.create_space(config)
             return SpaceResponse(
@@ -328,9 +328,9 @@ def create_app() -> FastAPI:
         if not database_connected:
             raise HTTPException(
                 status_code=503,
-                detail="Database is not connected. Please check your DATABASE_URL configuration."
+                detail="Database is not connected. Please check your DATABASE_URL configuration.",
             )
-        
+
         space_manager = SpaceManager(db)
         try:
             spaces = await space_manager.list_spaces(owner_id)
@@ -359,9 +359,9 @@ def create_app() -> FastAPI:
         if not database_connected:
             raise HTTPException(
                 status_code=503,
-                detail="Database is not connected. Please check your DATABASE_URL configuration."
+                detail="Database is not connected. Please check your DATABASE_URL configuration.",
             )
-        
+
         space_manager = SpaceManager(db)
         try:
             config = await space_manager.switch_space(space_id)
@@ -388,9 +388,9 @@ def create_app() -> FastAPI:
         if not database_connected:
             raise HTTPException(
                 status_code=503,
-                detail="Database is not connected. Please check your DATABASE_URL configuration."
+                detail="Database is not connected. Please check your DATABASE_URL configuration.",
             )
-        
+
         space_manager = SpaceManager(db)
         try:
             config = space_manager.get_current_space()
@@ -419,9 +419,9 @@ def create_app() -> FastAPI:
         if not database_connected:
             raise HTTPException(
                 status_code=503,
-                detail="Database is not connected. Please check your DATABASE_URL configuration."
+                detail="Database is not connected. Please check your DATABASE_URL configuration.",
             )
-        
+
         space_manager = SpaceManager(db)
         try:
             usage = await space_manager.get_space_usage(space_id, month)
@@ -429,7 +429,7 @@ def create_app() -> FastAPI:
             await space_manager.switch_space(space_id)
             config = space_manager.get_current_space()
             remaining = usage.get_budget_remaining(config)
-            
+
             return SpaceUsageResponse(
                 space_id=usage.space_id,
                 month=usage.month,
@@ -454,9 +454,9 @@ def create_app() -> FastAPI:
         if not database_connected:
             raise HTTPException(
                 status_code=503,
-                detail="Database is not connected. Please check your DATABASE_URL configuration."
+                detail="Database is not connected. Please check your DATABASE_URL configuration.",
             )
-        
+
         space_manager = SpaceManager(db)
         try:
             await space_manager.delete_space(space_id, permanently=permanently)
@@ -475,11 +475,11 @@ def create_app() -> FastAPI:
         """Stream chat responses with real-time RPI workflow updates."""
         if not database_connected:
             raise HTTPException(status_code=503, detail="Database is not connected.")
-        
+
         context_sources = None
         if request.context_sources:
             context_sources = [ContextSource(**cs) for cs in request.context_sources]
-        
+
         space_manager = None
         if request.space_id:
             space_manager = SpaceManager(db)
@@ -487,29 +487,39 @@ def create_app() -> FastAPI:
                 await space_manager.switch_space(request.space_id)
             except ValueError as e:
                 raise HTTPException(status_code=404, detail=str(e))
-        
+
         async def generate_stream():
             try:
-                yield f"data: {json.dumps({'type': 'start', 'message': 'Starting workflow...'})}\n\n"
-                result = await orchestrator.process_query(
-                    user_id=request.user_id,
-                    query=request.query,
-                    model=request.model,
-                    context_sources=context_sources,
-                    db=db,
-                    space_manager=space_manager,
+                yield _sse({"type": "start", "message": "Starting workflow..."})
+                # Answer tokens are forwarded as they arrive when the orchestrator
+                # can stream them; the full answer event below is always sent.
+                tokens: asyncio.Queue[Optional[str]] = asyncio.Queue()
+                task = asyncio.create_task(
+                    orchestrator.process_query(
+                        user_id=request.user_id,
+                        query=request.query,
+                        model=request.model,
+                        context_sources=context_sources,
+                        db=db,
+                        space_manager=space_manager,
+                        stream=tokens,
+                    )
                 )
+                task.add_done_callback(lambda _: tokens.put_nowait(None))
+                while (token := await tokens.get()) is not None:
+                    yield _sse({"type": "token", "content": token})
+                result = await task
                 if result.research:
-                    yield f"data: {json.dumps({'type': 'research', 'content': result.research})}\n\n"
+                    yield _sse({"type": "research", "content": result.research})
                 if result.plan:
-                    yield f"data: {json.dumps({'type': 'plan', 'content': result.plan})}\n\n"
-                yield f"data: {json.dumps({'type': 'answer', 'content': result.answer})}\n\n"
-                yield f"data: {json.dumps({'type': 'metadata', 'data': result.metadata})}\n\n"
-                yield f"data: {json.dumps({'type': 'done'})}\n\n"
+                    yield _sse({"type": "plan", "content": result.plan})
+                yield _sse({"type": "answer", "content": result.answer})
+                yield _sse({"type": "metadata", "data": result.metadata})
+                yield _sse({"type": "done"})
             except Exception as e:
                 logger.error(f"Error in stream: {e}", exc_info=True)
-                yield f"data: {json.dumps({'type': 'error', 'message': str(e)})}\n\n"
-        
+                yield _sse({"type": "error", "message": str(e)})
+
         return StreamingResponse(generate_stream(), media_type="text/event-stream")
 
     @app.get("/workflow/{session_id}/agents")
@@ -519,9 +529,24 @@ def create_app() -> FastAPI:
         return {
             "session_id": session_id,
             "agents": [
-                {"name": "Researcher", "role": "Research Assistant", "status": "idle", "tools_used": []},
-                {"name": "Planner", "role": "Implementation Planner", "status": "idle", "tools_used": []},
-                {"name": "Implementer", "role": "Implementation Executor", "status": "idle", "tools_used": []},
+                {
+                    "name": "Researcher",
+                    "role": "Research Assistant",
+                    "status": "idle",
+                    "tools_used": [],
+                },
+                {
+                    "name": "Planner",
+                    "role": "Implementation Planner",
+                    "status": "idle",
+                    "tools_used": [],
+                },
+                {
+                    "name": "Implementer",
+                    "role": "Implementation Executor",
+                    "status": "idle",
+                    "tools_used": [],
+                },
             ],
             "workflow_stage": "idle",
         }
@@ -535,27 +560,19 @@ def create_app() -> FastAPI:
         """Get visualization data for a space."""
         if not database_connected:
             raise HTTPException(status_code=503, detail="Database is not connected.")
-        
+
         space_manager = SpaceManager(db)
         try:
             await space_manager.switch_space(space_id)
             space_config = space_manager.get_current_space()
             usage = await space_manager.get_space_usage(space_id, month=month)
-            
+
             # Get memory connections (simplified - can be enhanced)
-            from app.adapters.chroma import ChromaMemoryAdapter
-            from app.config import get_settings
-            settings = get_settings()
-            memory = ChromaMemoryAdapter(
-                host=settings.chroma_host,
-                port=settings.chroma_port,
-                collection_name=space_config.mem0_collection_name,
-                persist_directory=settings.chroma_persist_dir,
-            )
-            
+            memory = get_memory_manager_for_space(space_config)
+
             # Sample recent memories for graph
-            recent_memories = await memory.search(user_id="*", query="", limit=20)
-            
+            recent_memories = await memory.list_memories(user_id="*", limit=20)
+
             return {
                 "space_id": space_id,
                 "usage": {
@@ -565,7 +582,10 @@ def create_app() -> FastAPI:
                     "tokens_remaining": usage.get_budget_remaining(space_config),
                 },
                 "memory_count": len(recent_memories),
-                "memories": [{"id": i, "text": m.text[:100], "score": m.score} for i, m in enumerate(recent_memories)],
+                "memories": [
+                    {"id": i, "text": m.text[:100], "score": m.score}
+                    for i, m in enumerate(recent_memories)
+                ],
             }
         except ValueError as e:
             raise HTTPException(status_code=404, detail=str(e))
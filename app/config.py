@@ -8,7 +8,9 @@ from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
 class Settings(BaseSettings):
-    model_config = SettingsConfigDict(env_file=".env", env_file_encoding="utf-8", case_sensitive=False, extra="ignore")
+    model_config = SettingsConfigDict(
+        env_file=".env", env_file_encoding="utf-8", case_sensitive=False, extra="ignore"
+    )
 
     openrouter_api_key: str = Field(...)
     database_url: str = Field(...)
@@ -19,6 +21,13 @@ class Settings(BaseSettings):
     chroma_port: int = Field(default=8000)
     chroma_collection_name: str = Field(default="memories")
     chroma_persist_dir: str = Field(default="./chroma_db")
+    chroma_per_user_collections: bool = Field(
+        default=False, description="Store each user's memories in a separate Chroma collection."
+    )
+    chroma_hnsw_search_ef: int = Field(
+        default=64,
+        description="HNSW search_ef for newly created Chroma collections (recall vs. latency).",
+    )
 
     langsmith_api_key: Optional[str] = Field(default=None)
     langsmith_project: str = Field(default="mera-ai")
@@ -28,8 +37,32 @@ class Settings(BaseSettings):
     obsidian_rest_url: str = Field(default="http://localhost:27124")
     obsidian_rest_token: Optional[str] = Field(default=None)
     obsidian_vault_path: Optional[str] = Field(default=None)
-    
-    cors_origins: Optional[str] = Field(default=None, description="Comma-separated list of allowed CORS origins. Use '*' for all origins (development only).")
+
+    llm_cache_enabled: bool = Field(
+        default=False,
+        description="Reuse completions for byte-identical LLM requests (bounded in-process cache, 1h).",
+    )
+    fast_path_enabled: bool = Field(
+        default=False,
+        description="Opt-in: answer tool-free queries with short context in a single LLM call instead of the crew.",
+    )
+    fast_path_max_memory_chars: int = Field(
+        default=2000,
+        description="Longest memory context (in characters) eligible for the single-call path.",
+    )
+    memory_context_max_chars: int = Field(
+        default=4000,
+        description="Character budget for retrieved memories placed in a prompt, after de-duplication.",
+    )
+    exact_token_counting: bool = Field(
+        default=False,
+        description="Tokenize with tiktoken for space usage; otherwise estimate one token per 4 bytes.",
+    )
+
+    cors_origins: Optional[str] = Field(
+        default=None,
+        description="Comma-separated list of allowed CORS origins. Use '*' for all origins (development only).",
+    )
 
 
 @lru_cache()
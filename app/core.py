@@ -1,6 +1,6 @@
 """Core types, protocols, and exceptions for Mera AI."""
 
-from typing import Dict, List, Optional, Protocol
+from typing import Any, Dict, List, Optional, Protocol
 
 from pydantic import BaseModel, Field
 
@@ -8,6 +8,7 @@ from pydantic import BaseModel, Field
 UserID = str
 Query = str
 
+
 # Data models
 class ContextSource(BaseModel):
     type: str = Field(...)
@@ -29,7 +30,7 @@ class LLMMessage(BaseModel):
 class LLMResponse(BaseModel):
     content: str = Field(...)
     model: str = Field(...)
-    metadata: Dict[str, str] = Field(default_factory=dict)
+    metadata: Dict[str, Any] = Field(default_factory=dict)
 
 
 class WorkflowState(BaseModel):
@@ -47,7 +48,8 @@ class WorkflowResult(BaseModel):
     answer: str
     research: Optional[str] = None
     plan: Optional[str] = None
-    metadata: Dict[str, str] = Field(default_factory=dict)
+    metadata: Dict[str, Any] = Field(default_factory=dict)
+
 
 # Protocols
 class LLMProvider(Protocol):
@@ -69,6 +71,14 @@ class MemoryManager(Protocol):
     ) -> None:
         ...
 
+    async def store_batch(
+        self,
+        user_id: UserID,
+        texts: List[str],
+        metadatas: Optional[List[Optional[dict]]] = None,
+    ) -> None:
+        ...
+
     async def search(
         self,
         user_id: UserID,
@@ -77,6 +87,13 @@ class MemoryManager(Protocol):
     ) -> List[Memory]:
         ...
 
+    async def list_memories(
+        self,
+        user_id: UserID,
+        limit: int = 50,
+    ) -> List[Memory]:
+        ...
+
 
 class Orchestrator(Protocol):
     async def process_query(
@@ -89,11 +106,14 @@ class Orchestrator(Protocol):
     ) -> WorkflowResult:
         ...
 
+
 # Exceptions
 class MeraAIError(Exception):
     """Base exception for all Mera AI errors."""
-    
-    def __init__(self, message: str, error_code: Optional[str] = None, context: Optional[dict] = None):
+
+    def __init__(
+        self, message: str, error_code: Optional[str] = None, context: Optional[dict] = None
+    ):
         super().__init__(message)
         self.message = message
         self.error_code = error_code
@@ -102,36 +122,41 @@ class MeraAIError(Exception):
 
 class ConfigurationError(MeraAIError):
     """Raised when there's a configuration error."""
+
     pass
 
 
 class SpaceError(MeraAIError):
     """Raised when there's an error related to spaces."""
+
     pass
 
 
 class SpaceNotFoundError(SpaceError):
     """Raised when a requested space is not found."""
+
     pass
 
 
 class SpaceBudgetExceededError(SpaceError):
     """Raised when a space's token budget is exceeded."""
+
     pass
 
 
 class MemoryError(MeraAIError):
     """Raised when there's an error with memory operations."""
+
     pass
 
 
 class LLMError(MeraAIError):
     """Raised when there's an error with LLM operations."""
+
     pass
 
 
 class ObsidianError(MeraAIError):
     """Raised when there's an error with Obsidian operations."""
-    pass
-
 
+    pass
@@ -1,12 +1,15 @@
 """CrewAI tools, agents, and tasks for Research → Plan → Implement workflow."""
 
 import asyncio
+import json
+import re
 from pathlib import Path
-from typing import List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 
 from crewai import Agent, Task
 from crewai.tools import tool
 
+from app._sync_bridge import run_coro
 from app.adapters.chroma import ChromaMemoryAdapter
 from app.adapters.obsidian import ObsidianClient
 from app.multi_agent_context_system import (
@@ -18,19 +21,13 @@ from app.multi_agent_context_system import (
     MemoryRetrieverAgent,
     MultiAgentCoordinator,
 )
+from app.prompts import format_context_prompt, no_context_parts
 
 # Prompts
+# Static instructions come first and per-request content last, so providers that
+# cache prompt prefixes (Anthropic, OpenAI via OpenRouter) can reuse them.
 RESEARCH_PROMPT = """TASK: A good group of people are understanding the user's request deeply.
 
-USER QUERY:
-{query}
-
-MEMORIES:
-{memories}
-
-OBSIDIAN CONTEXT:
-{obsidian_context}
-
 OUTPUT: A concise markdown document named 'research.md' with sections:
 1. Problem Statement
 2. Key Context and Constraints
@@ -38,7 +35,16 @@ OUTPUT: A concise markdown document named 'research.md' with sections:
 4. Open Questions / Gaps
 5. Recommended High-Level Approach
 
-Be factual and avoid speculation."""
+Be factual and avoid speculation.
+
+USER QUERY:
+{query}
+
+MEMORIES:
+{memories}
+
+OBSIDIAN CONTEXT:
+{obsidian_context}"""
 
 PLAN_PROMPT = """A good group of people are creating an implementation plan.
 
@@ -71,8 +77,20 @@ OUTPUT:
 - Final answer for the user
 - Brief summary of what you did"""
 
+# Research prompt for a request with no memories or Obsidian context (cold user,
+# no vault), formatted once and split around the query.
+_RESEARCH_PROMPT_NO_CONTEXT = no_context_parts(RESEARCH_PROMPT)
+
 
 # Tools
+_INPUT_SEPARATOR = re.compile(r"\s*[,\n]\s*")
+
+
+def _split_inputs(value: str) -> List[str]:
+    """Split a comma- or newline-separated tool input into non-empty items."""
+    return [item for item in _INPUT_SEPARATOR.split(value.strip()) if item]
+
+
 class ChromaMemoryTool:
     """CrewAI tool wrapper for ChromaMemoryAdapter."""
 
@@ -81,22 +99,30 @@ class ChromaMemoryTool:
         self.user_id = user_id
 
     def search_memory(self, query: str, limit: int = 5) -> str:
-        results = asyncio.run(self.memory.search(user_id=self.user_id, query=query, limit=limit))
+        results = run_coro(self.memory.search(user_id=self.user_id, query=query, limit=limit))
         if not results:
             return f"No relevant memories found for query: {query}"
-        return "\n\n".join([
-            f"Memory {i+1} (score: {m.score:.2f}):\n{m.text}"
-            for i, m in enumerate(results)
-        ])
+        return "\n\n".join(
+            [f"Memory {i+1} (score: {m.score:.2f}):\n{m.text}" for i, m in enumerate(results)]
+        )
 
     def to_crewai_tool(self):
         @tool("memory_search")
         def memory_search_tool(query: str, limit: int = 5) -> str:
             """Search the user's memory store for relevant past conversations, stored knowledge, or context. Use this to retrieve information from previous interactions."""
             return self.search_memory(query, limit)
+
         return memory_search_tool
 
 
+def _format_note(result: dict, max_chars: int = 500) -> str:
+    """Render one Obsidian search hit, reading its content only once."""
+    content = result.get("content", "")
+    if len(content) > max_chars:
+        content = f"{content[:max_chars]}..."
+    return f"Note: {result.get('path', 'Unknown')}\n{content}"
+
+
 class ObsidianTool:
     """CrewAI tool wrapper for ObsidianClient."""
 
@@ -104,21 +130,17 @@ class ObsidianTool:
         self.obsidian = obsidian
 
     def search_obsidian(self, query: str, limit: int = 5) -> str:
-        results = asyncio.run(self.obsidian.search(query=query, limit=limit))
+        results = run_coro(self.obsidian.search(query=query, limit=limit))
         if not results:
             return f"No relevant notes found in Obsidian vault for query: {query}"
-        return "\n\n".join([
-            f"Note: {r.get('path', 'Unknown')}\n{r.get('content', '')[:500]}..."
-            if len(r.get('content', '')) > 500
-            else f"Note: {r.get('path', 'Unknown')}\n{r.get('content', '')}"
-            for r in results
-        ])
+        return "\n\n".join(_format_note(r) for r in results)
 
     def to_crewai_tool(self):
         @tool("obsidian_search")
         def obsidian_search_tool(query: str, limit: int = 5) -> str:
             """Search the Obsidian knowledge base vault for relevant notes, documentation, or stored knowledge. Use this to retrieve information from the user's personal knowledge base."""
             return self.search_obsidian(query, limit)
+
         return obsidian_search_tool
 
 
@@ -128,8 +150,8 @@ class FileExplorerCrewAITool:
     def __init__(self, file_agent: FileExplorerAgent):
         self.file_agent = file_agent
 
-    def explore_files(self, paths: str) -> str:
-        path_list = [p.strip() for p in paths.replace("\n", ",").split(",") if p.strip()]
+    async def arun(self, paths: str) -> str:
+        path_list = _split_inputs(paths)
         sources = [
             ContextSource(
                 type=ContextSourceType.FILE if Path(p).is_file() else ContextSourceType.DIRECTORY,
@@ -137,13 +159,17 @@ class FileExplorerCrewAITool:
             )
             for p in path_list
         ]
-        return asyncio.run(self.file_agent.run(sources, query=""))
+        return await self.file_agent.run(sources, query="")
+
+    def explore_files(self, paths: str) -> str:
+        return run_coro(self.arun(paths))
 
     def to_crewai_tool(self):
         @tool("file_explorer")
         def file_explorer_tool(paths: str) -> str:
             """Explore local files and directories. Use this tool to read file contents or list directory structures. Input should be a list of file or directory paths (comma-separated)."""
             return self.explore_files(paths)
+
         return file_explorer_tool
 
 
@@ -153,8 +179,8 @@ class LinkCrawlerCrewAITool:
     def __init__(self, link_agent: LinkCrawlerAgent):
         self.link_agent = link_agent
 
-    def crawl_links(self, urls: str) -> str:
-        url_list = [u.strip() for u in urls.replace("\n", ",").split(",") if u.strip()]
+    async def arun(self, urls: str) -> str:
+        url_list = _split_inputs(urls)
         sources = [
             ContextSource(
                 type=ContextSourceType.URL if u.startswith("http") else ContextSourceType.API,
@@ -162,13 +188,17 @@ class LinkCrawlerCrewAITool:
             )
             for u in url_list
         ]
-        return asyncio.run(self.link_agent.run(sources, query=""))
+        return await self.link_agent.run(sources, query="")
+
+    def crawl_links(self, urls: str) -> str:
+        return run_coro(self.arun(urls))
 
     def to_crewai_tool(self):
         @tool("link_crawler")
         def link_crawler_tool(urls: str) -> str:
             """Fetch and summarize content from URLs or API endpoints. Use this tool to retrieve documentation, web pages, or API responses. Input should be a list of URLs or API endpoints (comma-separated)."""
             return self.crawl_links(urls)
+
         return link_crawler_tool
 
 
@@ -179,15 +209,19 @@ class DataAnalyzerCrewAITool:
         self.data_agent = data_agent
         self.query_context = query_context
 
-    def analyze_database(self, dsn: str) -> str:
+    async def arun(self, dsn: str) -> str:
         sources = [ContextSource(type=ContextSourceType.DATABASE, path=dsn)]
-        return asyncio.run(self.data_agent.run(sources, query=self.query_context or ""))
+        return await self.data_agent.run(sources, query=self.query_context or "")
+
+    def analyze_database(self, dsn: str) -> str:
+        return run_coro(self.arun(dsn))
 
     def to_crewai_tool(self):
         @tool("data_analyzer")
         def data_analyzer_tool(dsn: str) -> str:
             """Analyze database schemas and structures. Use this tool to explore database tables, columns, and relationships. Input should be a database connection string (DSN)."""
             return self.analyze_database(dsn)
+
         return data_analyzer_tool
 
 
@@ -197,7 +231,7 @@ class MemoryRetrieverCrewAITool:
     def __init__(self, memory_agent: MemoryRetrieverAgent):
         self.memory_agent = memory_agent
 
-    def retrieve_memory(self, identifier_and_query: str) -> str:
+    async def arun(self, identifier_and_query: str) -> str:
         parts = identifier_and_query.split(":", 1)
         if len(parts) == 2:
             identifier, query = parts
@@ -205,16 +239,85 @@ class MemoryRetrieverCrewAITool:
             identifier = "default"
             query = parts[0]
         sources = [ContextSource(type=ContextSourceType.MEMORY, path=identifier)]
-        return asyncio.run(self.memory_agent.run(sources, query=query))
+        return await self.memory_agent.run(sources, query=query)
+
+    def retrieve_memory(self, identifier_and_query: str) -> str:
+        return run_coro(self.arun(identifier_and_query))
 
     def to_crewai_tool(self):
         @tool("memory_retriever")
         def memory_retriever_tool(identifier_and_query: str) -> str:
             """Retrieve relevant memories from the memory store. Use this tool to search for past conversations, stored knowledge, or user context. Input should be 'identifier:query' or just 'query' (uses default identifier)."""
             return self.retrieve_memory(identifier_and_query)
+
         return memory_retriever_tool
 
 
+def _coordinator_tools(coordinator: MultiAgentCoordinator) -> Dict[str, Any]:
+    """Coordinator-backed tool wrappers keyed by their CrewAI tool name."""
+    tools: Dict[str, Any] = {}
+    if coordinator.file_agent:
+        tools["file_explorer"] = FileExplorerCrewAITool(file_agent=coordinator.file_agent)
+    if coordinator.link_agent:
+        tools["link_crawler"] = LinkCrawlerCrewAITool(link_agent=coordinator.link_agent)
+    if coordinator.data_agent:
+        tools["data_analyzer"] = DataAnalyzerCrewAITool(data_agent=coordinator.data_agent)
+    if coordinator.memory_agent:
+        tools["memory_retriever"] = MemoryRetrieverCrewAITool(memory_agent=coordinator.memory_agent)
+    return tools
+
+
+async def run_tool_batch(
+    coordinator: MultiAgentCoordinator, calls: List[Tuple[str, str]], timeout: float = 30.0
+) -> List[str]:
+    """Run several coordinator tool calls concurrently.
+
+    ``calls`` are ``(tool_name, tool_input)`` pairs using the CrewAI tool names.
+    Each call gets its own ``timeout`` so one slow URL or database does not hold
+    up the rest; failures are returned as messages in the call's position.
+    """
+    tools = _coordinator_tools(coordinator)
+
+    async def _run_one(name: str, tool_input: str) -> str:
+        wrapper = tools.get(name)
+        if wrapper is None:
+            return f"Unknown tool: {name}"
+        try:
+            return await asyncio.wait_for(wrapper.arun(tool_input), timeout)
+        except asyncio.TimeoutError:
+            return f"{name} timed out after {timeout:g}s"
+        except Exception as e:
+            return f"{name} failed: {e}"
+
+    return list(await asyncio.gather(*(_run_one(name, tool_input) for name, tool_input in calls)))
+
+
+class ContextBatchCrewAITool:
+    """CrewAI tool that fans several coordinator lookups out in parallel."""
+
+    def __init__(self, coordinator: MultiAgentCoordinator):
+        self.coordinator = coordinator
+
+    def run_batch(self, calls_json: str) -> str:
+        try:
+            calls = [(str(c["tool"]), str(c["input"])) for c in json.loads(calls_json)]
+        except (ValueError, TypeError, KeyError) as e:
+            return f'Invalid batch input ({e}). Expected a JSON list of {{"tool": ..., "input": ...}} objects.'
+        results = run_coro(run_tool_batch(self.coordinator, calls))
+        return "\n\n".join(
+            f"### {name}: {tool_input}\n{result}"
+            for (name, tool_input), result in zip(calls, results)
+        )
+
+    def to_crewai_tool(self):
+        @tool("context_batch")
+        def context_batch_tool(calls: str) -> str:
+            """Run several file_explorer, link_crawler, data_analyzer or memory_retriever lookups at once, in parallel. Input should be a JSON list like [{"tool": "link_crawler", "input": "https://..."}, {"tool": "file_explorer", "input": "src/app.py"}]. Prefer this over calling those tools one by one when you need several independent lookups."""
+            return self.run_batch(calls)
+
+        return context_batch_tool
+
+
 def create_crewai_tools(
     memory: Optional[ChromaMemoryAdapter] = None,
     obsidian: Optional[ObsidianClient] = None,
@@ -228,14 +331,10 @@ def create_crewai_tools(
     if obsidian:
         tools.append(ObsidianTool(obsidian=obsidian).to_crewai_tool())
     if coordinator:
-        if coordinator.file_agent:
-            tools.append(FileExplorerCrewAITool(file_agent=coordinator.file_agent).to_crewai_tool())
-        if coordinator.link_agent:
-            tools.append(LinkCrawlerCrewAITool(link_agent=coordinator.link_agent).to_crewai_tool())
-        if coordinator.data_agent:
-            tools.append(DataAnalyzerCrewAITool(data_agent=coordinator.data_agent).to_crewai_tool())
-        if coordinator.memory_agent:
-            tools.append(MemoryRetrieverCrewAITool(memory_agent=coordinator.memory_agent).to_crewai_tool())
+        coordinator_tools = _coordinator_tools(coordinator)
+        tools.extend(wrapper.to_crewai_tool() for wrapper in coordinator_tools.values())
+        if coordinator_tools:
+            tools.append(ContextBatchCrewAITool(coordinator=coordinator).to_crewai_tool())
     return tools
 
 
@@ -308,21 +407,25 @@ def create_agents_for_space(
     verbose: bool = False,
 ) -> tuple[Agent, Agent, Agent]:
     """Create all three agents (Researcher, Planner, Implementer) for a space."""
-    all_tools = create_crewai_tools(memory=memory, obsidian=obsidian, coordinator=coordinator, user_id=user_id)
+    all_tools = create_crewai_tools(
+        memory=memory, obsidian=obsidian, coordinator=coordinator, user_id=user_id
+    )
     researcher = create_researcher_agent(tools=all_tools, llm=llm, verbose=verbose)
     planner = create_planner_agent(llm=llm, verbose=verbose)
-    implementer_tools = [tool for tool in all_tools if tool.name in ["file_explorer", "link_crawler"]]
+    implementer_tools = [
+        tool for tool in all_tools if tool.name in ["file_explorer", "link_crawler"]
+    ]
     implementer = create_implementer_agent(tools=implementer_tools, llm=llm, verbose=verbose)
     return researcher, planner, implementer
 
 
 # Tasks
-def create_research_task(researcher_agent: Agent, query: str, memories: str = "", obsidian_context: str = "") -> Task:
+def create_research_task(
+    researcher_agent: Agent, query: str, memories: str = "", obsidian_context: str = ""
+) -> Task:
     """Create Research Task."""
-    description = RESEARCH_PROMPT.format(
-        query=query,
-        memories=memories or "No memories found.",
-        obsidian_context=obsidian_context or "No Obsidian context found.",
+    description = format_context_prompt(
+        RESEARCH_PROMPT, _RESEARCH_PROMPT_NO_CONTEXT, query, memories, obsidian_context
     )
     return Task(
         description=description,
@@ -336,7 +439,7 @@ def create_research_task(researcher_agent: Agent, query: str, memories: str = ""
 
 def create_plan_task(planner_agent: Agent, query: str, research_output: str) -> Task:
     """Create Plan Task."""
-    description = PLAN_PROMPT + "\n\nUSER QUERY:\n" + query + "\n\nRESEARCH:\n" + research_output
+    description = f"{PLAN_PROMPT}\n\nUSER QUERY:\n{query}\n\nRESEARCH:\n{research_output}"
     return Task(
         description=description,
         agent=planner_agent,
@@ -348,17 +451,11 @@ def create_plan_task(planner_agent: Agent, query: str, research_output: str) ->
     )
 
 
-def create_implement_task(implementer_agent: Agent, query: str, research_output: str, plan_output: str) -> Task:
+def create_implement_task(
+    implementer_agent: Agent, query: str, research_output: str, plan_output: str
+) -> Task:
     """Create Implement Task."""
-    description = (
-        IMPLEMENT_PROMPT
-        + "\n\nUSER QUERY:\n"
-        + query
-        + "\n\nRESEARCH:\n"
-        + research_output
-        + "\n\nPLAN:\n"
-        + plan_output
-    )
+    description = f"{IMPLEMENT_PROMPT}\n\nUSER QUERY:\n{query}\n\nRESEARCH:\n{research_output}\n\nPLAN:\n{plan_output}"
     return Task(
         description=description,
         agent=implementer_agent,
@@ -376,9 +473,16 @@ def create_tasks_for_workflow(
     obsidian_context: str = "",
 ) -> tuple[Task, Task, Task]:
     """Create all three tasks (Research, Plan, Implement) for a workflow."""
-    research_task = create_research_task(researcher_agent=researcher_agent, query=query, memories=memories, obsidian_context=obsidian_context)
+    research_task = create_research_task(
+        researcher_agent=researcher_agent,
+        query=query,
+        memories=memories,
+        obsidian_context=obsidian_context,
+    )
     plan_task = create_plan_task(planner_agent=planner_agent, query=query, research_output="")
     plan_task.context = [research_task]
-    implement_task = create_implement_task(implementer_agent=implementer_agent, query=query, research_output="", plan_output="")
+    implement_task = create_implement_task(
+        implementer_agent=implementer_agent, query=query, research_output="", plan_output=""
+    )
     implement_task.context = [research_task, plan_task]
     return research_task, plan_task, implement_task
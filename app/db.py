@@ -10,7 +10,9 @@ settings = get_settings()
 # Convert database URL to async format
 async_database_url = settings.database_url
 if "postgresql+psycopg2://" in async_database_url:
-    async_database_url = async_database_url.replace("postgresql+psycopg2://", "postgresql+asyncpg://")
+    async_database_url = async_database_url.replace(
+        "postgresql+psycopg2://", "postgresql+asyncpg://"
+    )
 elif async_database_url.startswith("postgresql://"):
     async_database_url = async_database_url.replace("postgresql://", "postgresql+asyncpg://", 1)
 
@@ -46,5 +48,3 @@ async def get_db() -> AsyncGenerator[AsyncSession, None]:
             yield session
         finally:
             await session.close()
-
-
@@ -9,5 +9,3 @@ def run() -> None:
 
 if __name__ == "__main__":
     run()
-
-
@@ -0,0 +1,35 @@
+"""Shared memory-manager instances, one per Chroma collection."""
+
+from functools import lru_cache
+from typing import Optional
+
+from app.adapters.chroma import ChromaMemoryAdapter
+from app.config import get_settings
+from app.spaces import SpaceConfig
+
+
+@lru_cache(maxsize=64)
+def get_memory_manager(collection_name: Optional[str] = None) -> ChromaMemoryAdapter:
+    """Return the memory adapter for ``collection_name`` (the configured default if None).
+
+    Adapters hold the Chroma client and their collection handles, so each
+    collection gets one instance for the life of the process.
+    """
+    settings = get_settings()
+    if collection_name is None:
+        return get_memory_manager(settings.chroma_collection_name)
+    return ChromaMemoryAdapter(
+        host=settings.chroma_host,
+        port=settings.chroma_port,
+        collection_name=collection_name,
+        persist_directory=settings.chroma_persist_dir,
+        per_user_collections=settings.chroma_per_user_collections,
+    )
+
+
+def get_memory_manager_for_space(space_config: Optional[SpaceConfig] = None) -> ChromaMemoryAdapter:
+    """Return the memory adapter for a space's collection, or the default one."""
+    return get_memory_manager(space_config.mem0_collection_name if space_config else None)
+
+
+__all__ = ["get_memory_manager", "get_memory_manager_for_space"]
@@ -1,7 +1,17 @@
 from datetime import datetime
 from typing import Any, Dict
 
-from sqlalchemy import Column, DateTime, String, Text, Integer, Numeric, UniqueConstraint, Index
+from sqlalchemy import (
+    Column,
+    DateTime,
+    String,
+    Text,
+    Integer,
+    Numeric,
+    UniqueConstraint,
+    Index,
+    text,
+)
 from sqlalchemy.dialects.postgresql import JSONB
 
 from app.db import Base
@@ -17,12 +27,27 @@ class ConversationMessage(Base):
     __tablename__ = "conversation_messages"
 
     id = Column(String, primary_key=True)
-    user_id = Column(String, index=True, nullable=False)
+    # Lookups by user_id use the (user_id, created_at) index below.
+    user_id = Column(String, nullable=False)
     role = Column(String, nullable=False)  # "user" | "assistant" | "system"
     content = Column(Text, nullable=False)
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
 
-    message_metadata = Column("metadata", JSONB, nullable=False, default=dict)  # type: ignore[assignment]
+    # The server default only applies to tables created from this model; create_all
+    # never alters existing ones, so writers still send {} explicitly.
+    message_metadata = Column("metadata", JSONB, nullable=False, default=dict, server_default=text("'{}'::jsonb"))  # type: ignore[assignment]
+
+    __table_args__ = (
+        # "Latest messages for a user" reads walk this index in order instead of sorting.
+        Index("idx_conversation_messages_user_created", "user_id", created_at.desc()),
+        # Containment filters (metadata @> '{...}') use this instead of scanning every row.
+        Index(
+            "idx_conversation_messages_metadata",
+            message_metadata,
+            postgresql_using="gin",
+            postgresql_ops={"metadata": "jsonb_path_ops"},
+        ),
+    )
 
     def to_dict(self) -> Dict[str, Any]:
         return {
@@ -88,8 +113,7 @@ class SpaceUsageRecord(Base):
             "month": self.month,
             "tokens_used": self.tokens_used,
             "api_calls_used": self.api_calls_used,
-            "cost_usd": float(self.cost_usd) if self.cost_usd else 0.0,
+            "cost_usd": float(self.cost_usd or 0),
             "created_at": self.created_at.isoformat(),
             "updated_at": self.updated_at.isoformat(),
         }
-
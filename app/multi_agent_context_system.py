@@ -2,17 +2,273 @@ from __future__ import annotations
 
 import asyncio
 import os
-from dataclasses import dataclass
+import threading
+import time
+import weakref
+from collections import OrderedDict, defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, replace
 from enum import Enum
+from functools import partial
+from itertools import groupby, islice
+from operator import itemgetter
 from pathlib import Path
 from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional
+from urllib.parse import urlsplit, urlunsplit
 
 import httpx
+from app._sync_bridge import aclose_per_loop
 from app.observability import observe_langsmith
-from sqlalchemy import inspect
+from sqlalchemy import text
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncEngine
 
 
+_MAX_FILE_CHARS = 50000
+_MAX_DIR_ENTRIES = 100
+# UTF-8 needs at most 4 bytes per character, so this many bytes always covers
+# the characters we keep; anything beyond it would be truncated anyway.
+_MAX_FILE_BYTES = _MAX_FILE_CHARS * 4
+
+
+# File reads and directory walks get their own bounded pool so a request
+# naming many paths cannot flood the default executor that CrewAI's
+# kickoff threads also run on.
+_file_executor = ThreadPoolExecutor(
+    max_workers=min(8, (os.cpu_count() or 1) + 4), thread_name_prefix="context-files"
+)
+
+
+async def _run_file_io(fn: Callable[..., Any], *args: Any) -> Any:
+    return await asyncio.get_running_loop().run_in_executor(_file_executor, partial(fn, *args))
+
+
+def _read_file_head(path: str) -> tuple[str, bool]:
+    """Read at most ``_MAX_FILE_CHARS`` characters of a file.
+
+    Returns the decoded text and whether the file was truncated. Only the
+    bytes that can end up in the result are read, so large files cost a
+    single bounded ``read`` instead of a full load.
+    """
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        size = os.fstat(fd).st_size
+        # Some special files report a size of 0; read up to the cap for those.
+        data = os.read(fd, min(size, _MAX_FILE_BYTES) if size else _MAX_FILE_BYTES)
+    finally:
+        os.close(fd)
+    content = data.decode("utf-8", errors="ignore")
+    truncated = len(content) > _MAX_FILE_CHARS or size > len(data)
+    return content[:_MAX_FILE_CHARS], truncated
+
+
+# Heads of recently read files keyed by (path, mtime_ns, size): re-reading an
+# unchanged file is a stat plus a dict lookup instead of a read and decode.
+_FILE_CACHE_SIZE = 256
+_file_cache: "OrderedDict[tuple[str, int, int], tuple[str, bool]]" = OrderedDict()
+_file_cache_lock = threading.Lock()
+
+
+def _read_file_head_cached(path: str) -> tuple[str, bool]:
+    st = os.stat(path)
+    key = (path, st.st_mtime_ns, st.st_size)
+    with _file_cache_lock:
+        cached = _file_cache.get(key)
+        if cached is not None:
+            _file_cache.move_to_end(key)
+            return cached
+    result = _read_file_head(path)
+    with _file_cache_lock:
+        _file_cache[key] = result
+        if len(_file_cache) > _FILE_CACHE_SIZE:
+            _file_cache.popitem(last=False)
+    return result
+
+
+def _list_dir(root: str, limit: int) -> List[str]:
+    """List up to ``limit`` non-hidden files under ``root``, relative to it.
+
+    Stops scanning as soon as ``limit`` files are found, so a huge tree costs
+    no more than the entries actually listed. As with ``os.walk``, symlinked
+    directories are neither followed nor listed, and subdirectories that cannot
+    be read are skipped; only an unreadable ``root`` raises.
+    """
+    files: List[str] = []
+    stack = [root]
+    while stack:
+        path = stack.pop()
+        try:
+            entries = os.scandir(path)
+        except OSError:
+            if path == root:
+                raise
+            continue
+        with entries:
+            for entry in entries:
+                if entry.name.startswith("."):
+                    continue
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        stack.append(entry.path)
+                        continue
+                    if entry.is_symlink() and entry.is_dir():
+                        continue
+                except OSError:
+                    continue
+                files.append(os.path.relpath(entry.path, root))
+                if len(files) >= limit:
+                    return files
+    return files
+
+
+# One pooled client per event loop (connections are bound to the loop that
+# opened them) so repeat hosts reuse TCP/TLS sessions across fetches, plus a
+# semaphore capping how many URLs are fetched at once.
+_URL_FETCH_CONCURRENCY = 32
+_url_fetchers: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, tuple[httpx.AsyncClient, asyncio.Semaphore]]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def _get_url_fetcher() -> tuple[httpx.AsyncClient, asyncio.Semaphore]:
+    loop = asyncio.get_running_loop()
+    fetcher = _url_fetchers.get(loop)
+    if fetcher is None:
+        client = httpx.AsyncClient(
+            http2=True,
+            timeout=10.0,
+            follow_redirects=True,
+            limits=httpx.Limits(max_keepalive_connections=50, max_connections=200),
+        )
+        fetcher = _url_fetchers[loop] = (client, asyncio.Semaphore(_URL_FETCH_CONCURRENCY))
+    return fetcher
+
+
+async def _close_url_client() -> None:
+    await aclose_per_loop(_url_fetchers, lambda fetcher: fetcher[0].aclose())
+
+
+@dataclass
+class _CachedPage:
+    body: str
+    etag: Optional[str]
+    last_modified: Optional[str]
+    fetched_at: float
+
+
+# Fetched pages are served as-is for _URL_FRESH_SECONDS, then revalidated with
+# If-None-Match / If-Modified-Since so an unchanged page costs a 304, not a body.
+_URL_CACHE_SIZE = 256
+_URL_FRESH_SECONDS = 300.0
+_url_cache: "OrderedDict[str, _CachedPage]" = OrderedDict()
+_url_cache_lock = threading.Lock()
+
+
+def _get_cached_page(url: str) -> Optional[_CachedPage]:
+    with _url_cache_lock:
+        page = _url_cache.get(url)
+        if page is not None:
+            _url_cache.move_to_end(url)
+        return page
+
+
+def _set_cached_page(url: str, page: _CachedPage) -> None:
+    with _url_cache_lock:
+        _url_cache[url] = page
+        _url_cache.move_to_end(url)
+        if len(_url_cache) > _URL_CACHE_SIZE:
+            _url_cache.popitem(last=False)
+
+
+# Engines are reused per (event loop, DSN): asyncpg connections are bound to the
+# loop that opened them, and repeat analyses then skip connection setup. DSNs come
+# from user-supplied context sources, so only the most recently used
+# _MAX_ENGINES per loop keep a pool open; evicted engines are disposed.
+_MAX_ENGINES = 8
+_engines: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, OrderedDict[str, AsyncEngine]]" = (
+    weakref.WeakKeyDictionary()
+)
+_disposals: "set[asyncio.Task[None]]" = set()
+
+
+def _get_engine(dsn: str) -> AsyncEngine:
+    async_dsn = dsn.replace("postgresql+psycopg2://", "postgresql+asyncpg://")
+    async_dsn = async_dsn.replace("postgresql://", "postgresql+asyncpg://")
+    engines = _engines.setdefault(asyncio.get_running_loop(), OrderedDict())
+    engine = engines.get(async_dsn)
+    if engine is not None:
+        engines.move_to_end(async_dsn)
+        return engine
+    engine = engines[async_dsn] = create_async_engine(
+        async_dsn,
+        connect_args={"command_timeout": 5},
+        pool_size=5,
+        pool_pre_ping=True,
+    )
+    if len(engines) > _MAX_ENGINES:
+        _, evicted = engines.popitem(last=False)
+        # Connections still checked out by a running analysis are closed when returned.
+        task = asyncio.ensure_future(evicted.dispose())
+        _disposals.add(task)
+        task.add_done_callback(_disposals.discard)
+    return engine
+
+
+async def _dispose_engines() -> None:
+    loop = asyncio.get_running_loop()
+    engines = _engines.pop(loop, {})
+    pending = [task for task in _disposals if task.get_loop() is loop]
+    await asyncio.gather(
+        *pending, *(engine.dispose() for engine in engines.values()), return_exceptions=True
+    )
+
+
+# Columns of the first _SCHEMA_MAX_TABLES base tables (by name) of the connection's
+# current schema in one round-trip, plus the schema's total table count, so wide
+# schemas only pay for the tables that are shown.
+_SCHEMA_MAX_TABLES = 20
+_SCHEMA_COLUMNS_SQL = text(
+    "WITH shown AS ("
+    " SELECT table_name, count(*) OVER () AS table_count"
+    " FROM information_schema.tables"
+    " WHERE table_schema = current_schema() AND table_type = 'BASE TABLE'"
+    " ORDER BY table_name LIMIT :max_tables"
+    ") "
+    "SELECT s.table_count, c.table_name, c.column_name, c.data_type "
+    "FROM shown s "
+    "JOIN information_schema.columns c ON c.table_schema = current_schema() AND c.table_name = s.table_name "
+    "ORDER BY c.table_name, c.ordinal_position"
+)
+
+
+_DEFAULT_PORTS = {"http": 80, "https": 443}
+
+
+def _canonical_url(url: str) -> str:
+    """Lower-case scheme and host and drop a default port, for de-duplication."""
+    try:
+        parts = urlsplit(url)
+        port = parts.port
+    except ValueError:
+        return url
+    if not parts.hostname or parts.username or parts.password:
+        return url
+    scheme = parts.scheme.lower()
+    netloc = (
+        parts.hostname
+        if port is None or port == _DEFAULT_PORTS.get(scheme)
+        else f"{parts.hostname}:{port}"
+    )
+    return urlunsplit((scheme, netloc, parts.path, parts.query, parts.fragment))
+
+
+def _unique(items: Iterable[str], key: Callable[[str], str]) -> List[str]:
+    """Drop items whose ``key`` was already seen, keeping the first spelling and the order."""
+    first: Dict[str, str] = {}
+    for item in items:
+        first.setdefault(key(item), item)
+    return list(first.values())
+
+
 class ContextSourceType(str, Enum):
     FILE = "FILE"
     DIRECTORY = "DIRECTORY"
@@ -46,7 +302,14 @@ class FileExplorerAgent:
 
     @observe_langsmith(name="file_explorer_agent")
     async def run(self, sources: List[ContextSource], query: str) -> str:
-        paths = [s.path for s in sources if s.type in {ContextSourceType.FILE, ContextSourceType.DIRECTORY}]
+        paths = _unique(
+            (
+                s.path
+                for s in sources
+                if s.type in {ContextSourceType.FILE, ContextSourceType.DIRECTORY}
+            ),
+            os.path.normpath,
+        )
         if not paths:
             return ""
         content = await self.read_paths(paths)
@@ -64,7 +327,10 @@ class LinkCrawlerAgent:
 
     @observe_langsmith(name="link_crawler_agent")
     async def run(self, sources: List[ContextSource], query: str) -> str:
-        urls = [s.path for s in sources if s.type in {ContextSourceType.URL, ContextSourceType.API}]
+        urls = _unique(
+            (s.path for s in sources if s.type in {ContextSourceType.URL, ContextSourceType.API}),
+            _canonical_url,
+        )
         if not urls:
             return ""
         docs = await self.fetch_urls(urls)
@@ -82,7 +348,7 @@ class DataAnalyzerAgent:
 
     @observe_langsmith(name="data_analyzer_agent")
     async def run(self, sources: List[ContextSource], query: str) -> str:
-        dbs = [s.path for s in sources if s.type == ContextSourceType.DATABASE]
+        dbs = list(dict.fromkeys(s.path for s in sources if s.type == ContextSourceType.DATABASE))
         if not dbs:
             return ""
         analysis = await self.analyze_databases(dbs, query)
@@ -97,15 +363,14 @@ class MemoryRetrieverAgent:
 
     @observe_langsmith(name="memory_retriever_agent")
     async def run(self, sources: List[ContextSource], query: str) -> str:
-        if not any(s.type == ContextSourceType.MEMORY for s in sources):
+        identifiers = list(
+            dict.fromkeys(s.path for s in sources if s.type == ContextSourceType.MEMORY)
+        )
+        if not identifiers:
             return ""
-        tasks = [
-            self.retrieve_memory(src.path, query)
-            for src in sources
-            if src.type == ContextSourceType.MEMORY
-        ]
+        tasks = [self.retrieve_memory(identifier, query) for identifier in identifiers]
         combined = await asyncio.gather(*tasks)
-        text = "\n\n".join([c for c in combined if c])
+        text = "\n\n".join(c for c in combined if c)
         if not text:
             return ""
         return f"# Memory Findings\n\n{text}"
@@ -123,6 +388,29 @@ class SynthesizerAgent:
         return header + body
 
 
+# Per-agent deadlines (seconds) in research_with_context, so one slow database
+# or URL cannot hold back the synthesis of everything else.
+_AGENT_TIMEOUTS: Dict[str, float] = {"file": 10.0, "link": 15.0, "data": 10.0, "memory": 5.0}
+
+
+_AGENT_FOR_SOURCE_TYPE: Dict[ContextSourceType, str] = {
+    ContextSourceType.FILE: "file",
+    ContextSourceType.DIRECTORY: "file",
+    ContextSourceType.URL: "link",
+    ContextSourceType.API: "link",
+    ContextSourceType.DATABASE: "data",
+    ContextSourceType.MEMORY: "memory",
+}
+
+
+async def _run_with_deadline(name: str, coro: Awaitable[str]) -> str:
+    timeout = _AGENT_TIMEOUTS[name]
+    try:
+        return await asyncio.wait_for(coro, timeout)
+    except asyncio.TimeoutError:
+        return f"{name} agent timed out after {timeout:g}s"
+
+
 @dataclass
 class MultiAgentCoordinator:
     """Coordinate specialized sub-agents based on a ContextSpecification."""
@@ -186,31 +474,19 @@ class MultiAgentCoordinator:
 
                 if path.is_file():
                     try:
-                        content = await asyncio.to_thread(path.read_text, encoding="utf-8", errors="ignore")
-                        if len(content) > 50000:
-                            content = content[:50000] + "\n\n[... truncated ...]"
+                        content, truncated = await _run_file_io(_read_file_head_cached, path_str)
+                        if truncated:
+                            content += "\n\n[... truncated ...]"
                         return f"## File: {path_str}\n\n```\n{content}\n```"
                     except Exception as e:
                         return f"Error reading {path_str}: {e}"
 
                 elif path.is_dir():
                     try:
-                        def walk_dir(p: Path) -> List[str]:
-                            files = []
-                            for root, dirs, filenames in os.walk(p):
-                                # Skip hidden dirs and common ignore patterns
-                                dirs[:] = [d for d in dirs if not d.startswith(".")]
-                                for filename in filenames:
-                                    if filename.startswith("."):
-                                        continue
-                                    filepath = Path(root) / filename
-                                    files.append(str(filepath.relative_to(p)))
-                            return files
-
-                        files = await asyncio.to_thread(walk_dir, path)
-                        file_list = "\n".join(files[:100])
-                        if len(files) > 100:
-                            file_list += f"\n... and {len(files) - 100} more files"
+                        files = await _run_file_io(_list_dir, path_str, _MAX_DIR_ENTRIES + 1)
+                        file_list = "\n".join(files[:_MAX_DIR_ENTRIES])
+                        if len(files) > _MAX_DIR_ENTRIES:
+                            file_list += "\n... and more files"
                         return f"## Directory: {path_str}\n\nFiles:\n{file_list}"
                     except Exception as e:
                         return f"Error reading directory {path_str}: {e}"
@@ -222,26 +498,39 @@ class MultiAgentCoordinator:
             return "\n\n".join(results)
 
         async def fetch_urls(urls: Iterable[str]) -> str:
-            client = httpx.AsyncClient(
-                timeout=10.0,
-                follow_redirects=True,
-                limits=httpx.Limits(max_keepalive_connections=20, max_connections=100),
-            )
+            client, semaphore = _get_url_fetcher()
 
             async def fetch_single_url(url: str) -> str:
-                cache_key = ("url_fetch", url)
-                cached_content = await get_cached("url_fetch", cache_key)
-                if cached_content is not None:
-                    return cached_content
-                
+                cached = _get_cached_page(url)
+                if cached is not None and time.monotonic() - cached.fetched_at < _URL_FRESH_SECONDS:
+                    return cached.body
+                headers = {}
+                if cached is not None:
+                    if cached.etag:
+                        headers["If-None-Match"] = cached.etag
+                    if cached.last_modified:
+                        headers["If-Modified-Since"] = cached.last_modified
+
                 try:
-                    response = await client.get(url)
+                    async with semaphore:
+                        response = await client.get(url, headers=headers)
+                    if response.status_code == 304 and cached is not None:
+                        _set_cached_page(url, replace(cached, fetched_at=time.monotonic()))
+                        return cached.body
                     response.raise_for_status()
                     content = response.text
                     if len(content) > 50000:
                         content = content[:50000] + "\n\n[... truncated ...]"
                     result = f"## URL: {url}\n\n```\n{content}\n```"
-                    await set_cached("url_fetch", cache_key, result, ttl=1800)
+                    _set_cached_page(
+                        url,
+                        _CachedPage(
+                            result,
+                            response.headers.get("etag"),
+                            response.headers.get("last-modified"),
+                            time.monotonic(),
+                        ),
+                    )
                     return result
                 except httpx.RequestError as e:
                     return f"Error fetching {url}: Network error - {e}"
@@ -250,46 +539,39 @@ class MultiAgentCoordinator:
                 except Exception as e:
                     return f"Error fetching {url}: {e}"
 
-            try:
-                tasks = [fetch_single_url(url) for url in urls]
-                results = await asyncio.gather(*tasks)
-                return "\n\n".join(results)
-            finally:
-                await client.aclose()
+            tasks = [fetch_single_url(url) for url in urls]
+            results = await asyncio.gather(*tasks)
+            return "\n\n".join(results)
 
         async def analyze_databases(dbs: Iterable[str], query: str) -> str:
             async def analyze_single_db(dsn: str) -> str:
                 try:
-                    async_dsn = dsn.replace("postgresql+psycopg2://", "postgresql+asyncpg://")
-                    async_dsn = async_dsn.replace("postgresql://", "postgresql+asyncpg://")
-                    
-                    engine: AsyncEngine = create_async_engine(
-                        async_dsn,
-                        connect_args={"command_timeout": 5},
-                        pool_pre_ping=True,
-                    )
-
-                    async with engine.begin() as conn:
-                        inspector = inspect(engine.sync_engine)
-                        tables = inspector.get_table_names()
-                        
-                        if not tables:
-                            return f"## Database: {dsn}\n\nNo tables found."
-
-                        schema_info = []
-                        for table_name in tables[:20]:
-                            columns = inspector.get_columns(table_name)
-                            col_info = ", ".join([f"{c['name']} ({c['type']})" for c in columns[:10]])
-                            schema_info.append(f"- **{table_name}**: {col_info}")
-
-                        result = (
-                            f"## Database: {dsn}\n\n"
-                            f"Query context: {query}\n\n"
-                            f"Tables ({len(tables)}):\n" + "\n".join(schema_info)
+                    async with _get_engine(dsn).connect() as conn:
+                        rows = (
+                            await conn.execute(
+                                _SCHEMA_COLUMNS_SQL, {"max_tables": _SCHEMA_MAX_TABLES}
+                            )
+                        ).all()
+
+                    if not rows:
+                        return f"## Database: {dsn}\n\nNo tables found."
+                    table_count = rows[0][0]
+
+                    schema_info = []
+                    for table_name, columns in groupby(rows, key=itemgetter(1)):
+                        col_info = ", ".join(
+                            [
+                                f"{column_name} ({data_type})"
+                                for _, _, column_name, data_type in islice(columns, 10)
+                            ]
                         )
-                    
-                    await engine.dispose()
-                    return result
+                        schema_info.append(f"- **{table_name}**: {col_info}")
+
+                    return (
+                        f"## Database: {dsn}\n\n"
+                        f"Query context: {query}\n\n"
+                        f"Tables ({table_count}):\n" + "\n".join(schema_info)
+                    )
                 except Exception as e:
                     return f"Error analyzing database {dsn}: {e}"
 
@@ -305,7 +587,7 @@ class MultiAgentCoordinator:
                 memories = await mem0_wrapper.search(user_id=user_id, query=query, limit=5)
                 if not memories:
                     return f"No relevant memories found for '{identifier}'"
-                mem_texts = [m.get("text", "") for m in memories if m.get("text")]
+                mem_texts = [mem_text for m in memories if (mem_text := m.text)]
                 return "\n\n".join(mem_texts)
             except Exception as e:
                 return f"Error retrieving memory: {e}"
@@ -321,15 +603,22 @@ class MultiAgentCoordinator:
     @observe_langsmith(name="multi_agent_coordinator")
     async def research_with_context(self, spec: ContextSpecification) -> str:
         """Run all applicable sub-agents in parallel and synthesize their findings."""
-        sources = spec.sources
-        file_part, link_part, data_part, memory_part = await asyncio.gather(
-            self.file_agent.run(sources, spec.query),
-            self.link_agent.run(sources, spec.query),
-            self.data_agent.run(sources, spec.query),
-            self.memory_agent.run(sources, spec.query),
+        # One pass over the spec; each agent gets only its own sources, and
+        # agents with nothing to do are not started at all.
+        by_agent: Dict[str, List[ContextSource]] = defaultdict(list)
+        for source in spec.sources:
+            by_agent[_AGENT_FOR_SOURCE_TYPE[source.type]].append(source)
+        agents = {
+            "file": self.file_agent,
+            "link": self.link_agent,
+            "data": self.data_agent,
+            "memory": self.memory_agent,
+        }
+        parts = await asyncio.gather(
+            *(
+                _run_with_deadline(name, agent.run(by_agent[name], spec.query))
+                for name, agent in agents.items()
+                if by_agent[name]
+            )
         )
-
-        parts = [file_part, link_part, data_part, memory_part]
-        return self.synth_agent.run(parts, query=spec.query)
-
-
+        return self.synth_agent.run(list(parts), query=spec.query)
@@ -1,85 +1,342 @@
 """CrewAI orchestrator with Research → Plan → Implement workflow."""
 
 import asyncio
+import hashlib
+import json
 import logging
-from dataclasses import dataclass
-from typing import Any, List, Optional
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Any, Callable, Coroutine, Dict, List, Optional, Set
+from uuid import uuid4
 
 import tiktoken
-from crewai import Crew, Process
 from langchain_core.language_models import BaseChatModel
 from langchain_core.messages import AIMessage
 from langchain_core.outputs import ChatGeneration, ChatResult
-from sqlalchemy import text
+from sqlalchemy import insert, text
+from sqlalchemy.exc import DataError, IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app._sync_bridge import run_coro
 from app.adapters.chroma import ChromaMemoryAdapter
 from app.adapters.openrouter import OpenRouterLLMAdapter
 from app.adapters.obsidian import ObsidianClient
 from app.config import get_settings
-from app.core import ContextSource, LLMMessage, Orchestrator, Query, UserID, WorkflowResult
-from app.crewai import create_agents_for_space, create_tasks_for_workflow
+from app.core import ContextSource, LLMMessage, Memory, Orchestrator, Query, UserID, WorkflowResult
+from app.db import AsyncSessionLocal
+from app.memory_factory import get_memory_manager
 from app.models import ConversationMessage
 from app.multi_agent_context_system import MultiAgentCoordinator
 from app.observability import observe_langsmith
-from app.spaces import SpaceConfig, SpaceManager
+from app.prompts import format_context_prompt, no_context_parts
+from app.spaces import SpaceManager
 
 logger = logging.getLogger(__name__)
 
+# Cap on concurrently running background writes (memory stores) per orchestrator.
+_MAX_BACKGROUND_WRITES = 64
 
-def _estimate_tokens(content: Any) -> int:
-    """Estimate token count using tiktoken."""
+# Single-call variant of the Research → Plan → Implement prompts (see app.crewai),
+# used when there are no tools or context sources to consult and the retrieved
+# context is short. Static instructions stay ahead of the per-request content.
+FAST_PATH_PROMPT = """TASK: Research the user's request, plan how to answer it, then answer it.
+
+Use only the provided memories and Obsidian context; be factual and avoid speculation.
+
+OUTPUT: A single JSON object, with no surrounding text, of the form
+{{"research": "<markdown research notes>", "plan": "<markdown step-by-step plan>", "answer": "<final answer for the user>"}}
+
+USER QUERY:
+{query}
+
+MEMORIES:
+{memories}
+
+OBSIDIAN CONTEXT:
+{obsidian_context}"""
+
+# Streaming counterpart of FAST_PATH_PROMPT: plain text so tokens can be
+# forwarded to the client as they arrive.
+FAST_PATH_STREAM_PROMPT = """TASK: Answer the user's request directly.
+
+Use only the provided memories and Obsidian context; be factual and avoid speculation.
+
+OUTPUT: The final answer for the user in markdown.
+
+USER QUERY:
+{query}
+
+MEMORIES:
+{memories}
+
+OBSIDIAN CONTEXT:
+{obsidian_context}"""
+
+
+# Cold users with no vault are a common shape; their prompts only vary by query.
+_FAST_PATH_NO_CONTEXT = no_context_parts(FAST_PATH_PROMPT)
+_FAST_PATH_STREAM_NO_CONTEXT = no_context_parts(FAST_PATH_STREAM_PROMPT)
+
+
+@lru_cache(maxsize=None)
+def _crew_workflow():
+    """Import the CrewAI workflow on first use.
+
+    crewai and its dependency tree are slow to import and large in memory;
+    processes that only ever take the single-call path never load them.
+    """
+    from crewai import Crew, Process
+
+    from app.crewai import create_agents_for_space, create_tasks_for_workflow
+
+    return Crew, Process, create_agents_for_space, create_tasks_for_workflow
+
+
+@lru_cache(maxsize=4)
+def _get_encoder(model: str) -> "tiktoken.Encoding":
+    """Load the BPE encoder for ``model`` once; building it is far costlier than encoding."""
     try:
-        enc = tiktoken.encoding_for_model("gpt-4o")
+        return tiktoken.encoding_for_model(model)
     except Exception:
-        enc = tiktoken.get_encoding("cl100k_base")
-    return len(enc.encode(str(content)))
-
-
-def _get_memory_for_space(space_config: Optional[SpaceConfig] = None) -> ChromaMemoryAdapter:
-    """Get memory manager for a space."""
-    settings = get_settings()
-    collection_name = space_config.mem0_collection_name if space_config else settings.chroma_collection_name
-    return ChromaMemoryAdapter(
-        host=settings.chroma_host,
-        port=settings.chroma_port,
-        collection_name=collection_name,
-        persist_directory=settings.chroma_persist_dir,
+        return tiktoken.get_encoding("cl100k_base")
+
+
+def _estimate_tokens(*contents: Any, exact: bool = True) -> int:
+    """Estimate the total token count of ``contents``.
+
+    With ``exact`` the texts are tokenized with tiktoken, inline: the batch
+    API would start a thread pool per call for a handful of short strings.
+    ``encode_ordinary`` treats special-token text as plain text, so user
+    content containing e.g. ``<|endoftext|>`` is counted instead of raising.
+    Otherwise the count is approximated as one token per four UTF-8 bytes.
+    """
+    if not exact:
+        return sum(len(str(content).encode()) for content in contents) // 4
+    encoder = _get_encoder("gpt-4o")
+    return sum(len(encoder.encode_ordinary(str(content))) for content in contents)
+
+
+def _join_memories(memories: List[Memory], max_chars: int) -> str:
+    """Join retrieved memories for a prompt, best-ranked first, within ``max_chars``.
+
+    Memories that only differ in case or whitespace are included once, and
+    any memory that would overflow the budget is skipped so a single long
+    entry does not crowd out the shorter ones ranked after it.
+    """
+    seen: Set[str] = set()
+    kept: List[str] = []
+    used = 0
+    for memory in memories:
+        text = memory.text.strip()
+        normalized = " ".join(text.lower().split())
+        if not normalized or normalized in seen:
+            continue
+        seen.add(normalized)
+        cost = len(text) + (1 if kept else 0)
+        if used + cost > max_chars:
+            continue
+        kept.append(text)
+        used += cost
+    return "\n".join(kept)
+
+
+@lru_cache(maxsize=128)
+def _space_bundle(
+    collection_name: str, vault_path: Optional[str]
+) -> tuple[ChromaMemoryAdapter, ObsidianClient, MultiAgentCoordinator]:
+    """Memory, Obsidian client and coordinator for a space, built once per (collection, vault).
+
+    Bounded so that spaces that stop being used are eventually dropped.
+    """
+    memory = get_memory_manager(collection_name)
+    return (
+        memory,
+        ObsidianClient(vault_path=vault_path),
+        MultiAgentCoordinator.production(mem0_wrapper=memory),
     )
 
 
+def _task_output_text(task: Any) -> str:
+    """Text of a finished CrewAI task: its output's ``raw`` if set, else the output itself."""
+    output = getattr(task, "output", None)
+    if not output:
+        return ""
+    raw = getattr(output, "raw", None)
+    return str(raw) if raw is not None else str(output)
+
+
+def _parse_fast_path_response(content: str) -> tuple[str, str, str]:
+    """Split a fast-path completion into (research, plan, answer).
+
+    Falls back to treating the whole completion as the answer when the model
+    did not return the requested JSON object.
+    """
+    raw = content.strip()
+    if raw.startswith("```"):
+        raw = raw.strip("`").removeprefix("json").strip()
+    try:
+        data = json.loads(raw)
+    except ValueError:
+        return "", "", content
+    if not isinstance(data, dict) or not data.get("answer"):
+        return "", "", content
+    return str(data.get("research", "")), str(data.get("plan", "")), str(data["answer"])
+
+
+class ConversationWriter:
+    """Batches conversation rows from concurrent requests into shared transactions.
+
+    Rows are queued without waiting on the database; a single writer task
+    drains the queue, gathering up to ``max_batch`` entries or ``max_delay``
+    seconds' worth before inserting them in one multi-row INSERT per schema.
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], AsyncSession],
+        max_batch: int = 100,
+        max_delay: float = 0.05,
+    ) -> None:
+        self._session_factory = session_factory
+        self._max_batch = max_batch
+        self._max_delay = max_delay
+        self._queue: Optional["asyncio.Queue[tuple[Optional[str], List[Dict[str, Any]]]]"] = None
+        self._task: Optional["asyncio.Task[None]"] = None
+
+    def put(self, space_schema: Optional[str], rows: List[Dict[str, Any]]) -> None:
+        """Queue ``rows`` for insertion into ``space_schema`` (or the default schema)."""
+        if self._task is None or self._task.done():
+            if self._task is not None:
+                # Only aclose() is meant to stop the writer; restart it on the same
+                # queue so rows already waiting are still written.
+                logger.error("Conversation writer stopped unexpectedly; restarting it")
+            if self._queue is None:
+                # Started lazily: the writer must live on the loop serving requests.
+                self._queue = asyncio.Queue()
+            self._task = asyncio.create_task(self._run())
+        self._queue.put_nowait((space_schema, rows))
+
+    async def _run(self) -> None:
+        queue = self._queue
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await queue.get()]
+            deadline = loop.time() + self._max_delay
+            while len(batch) < self._max_batch:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(queue.get(), remaining))
+                except asyncio.TimeoutError:
+                    break
+            try:
+                await self._flush(batch)
+            except Exception as e:
+                logger.error(f"Failed to persist {len(batch)} conversation(s): {e}", exc_info=True)
+            finally:
+                for _ in batch:
+                    queue.task_done()
+
+    async def _flush(self, batch: List[tuple[Optional[str], List[Dict[str, Any]]]]) -> None:
+        exchanges_by_schema: Dict[Optional[str], List[List[Dict[str, Any]]]] = {}
+        for space_schema, rows in batch:
+            exchanges_by_schema.setdefault(space_schema, []).append(rows)
+        async with self._session_factory() as session:
+            # Each schema is its own transaction, so a failure in one (e.g. a
+            # missing space schema) does not lose the others' rows.
+            for space_schema, exchanges in exchanges_by_schema.items():
+                try:
+                    await self._insert(
+                        session, space_schema, [row for rows in exchanges for row in rows]
+                    )
+                except (IntegrityError, DataError) as e:
+                    await session.rollback()
+                    logger.warning(
+                        f"Batched insert of {len(exchanges)} conversation(s) failed ({e}); retrying one at a time"
+                    )
+                    for rows in exchanges:
+                        try:
+                            await self._insert(session, space_schema, rows)
+                        except Exception as e:
+                            await session.rollback()
+                            logger.error(f"Failed to persist conversation: {e}", exc_info=True)
+                except Exception as e:
+                    await session.rollback()
+                    logger.error(
+                        f"Failed to persist {len(exchanges)} conversation(s): {e}", exc_info=True
+                    )
+
+    async def _insert(
+        self, session: AsyncSession, space_schema: Optional[str], rows: List[Dict[str, Any]]
+    ) -> None:
+        if space_schema:
+            # SET LOCAL keeps the schema switch scoped to this transaction
+            # instead of leaking it into the pooled connection.
+            await session.execute(text(f'SET LOCAL search_path TO "{space_schema}", public'))
+        # Core insert: one multi-row INSERT without ORM unit-of-work bookkeeping.
+        await session.execute(insert(ConversationMessage), rows)
+        await session.commit()
+
+    async def aclose(self, timeout: Optional[float] = 10.0) -> None:
+        """Flush queued rows (waiting up to ``timeout`` seconds) and stop the writer."""
+        if self._task is None:
+            return
+        try:
+            await asyncio.wait_for(self._queue.join(), timeout)
+        except asyncio.TimeoutError:
+            logger.warning(f"Dropping {self._queue.qsize()} unwritten conversation(s) at shutdown")
+        self._task.cancel()
+        await asyncio.gather(self._task, return_exceptions=True)
+        self._task = None
+        self._queue = None
+
+
 class OpenRouterLLMWrapper(BaseChatModel):
     """LangChain-compatible wrapper for OpenRouter LLM adapter."""
-    
-    def __init__(self, model: str = "openai/gpt-4o-mini", **kwargs):
-        super().__init__(**kwargs)
-        self.model = model
-        self.adapter = OpenRouterLLMAdapter()
-    
+
+    model: str = "openai/gpt-4o-mini"
+    adapter: Any = None
+
+    def __init__(
+        self,
+        model: str = "openai/gpt-4o-mini",
+        adapter: Optional[OpenRouterLLMAdapter] = None,
+        **kwargs,
+    ):
+        super().__init__(model=model, adapter=adapter or OpenRouterLLMAdapter(), **kwargs)
+
     @property
     def _llm_type(self) -> str:
         return "openrouter"
-    
+
     def _generate(self, messages, stop=None, run_manager=None, **kwargs):
-        import asyncio
-        return asyncio.run(self._agenerate(messages, stop=stop, run_manager=run_manager, **kwargs))
-    
+        return run_coro(self._agenerate(messages, stop=stop, run_manager=run_manager, **kwargs))
+
     async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs):
         llm_messages = []
         for msg in messages:
-            if hasattr(msg, 'type'):
-                role_map = {'human': 'user', 'user': 'user', 'ai': 'assistant', 'assistant': 'assistant', 'system': 'system'}
-                role = role_map.get(msg.type, 'user')
-            elif hasattr(msg, 'role'):
+            if hasattr(msg, "type"):
+                role_map = {
+                    "human": "user",
+                    "user": "user",
+                    "ai": "assistant",
+                    "assistant": "assistant",
+                    "system": "system",
+                }
+                role = role_map.get(msg.type, "user")
+            elif hasattr(msg, "role"):
                 role = msg.role
             else:
-                role = 'user'
-            content = msg.content if hasattr(msg, 'content') else str(msg)
+                role = "user"
+            content = msg.content if hasattr(msg, "content") else str(msg)
             llm_messages.append(LLMMessage(role=role, content=content))
-        
+
         response = await self.adapter.chat(messages=llm_messages, model=self.model, **kwargs)
         ai_message = AIMessage(content=response.content)
-        generation = ChatGeneration(message=ai_message, generation_info={"model": response.model, **response.metadata})
+        generation = ChatGeneration(
+            message=ai_message, generation_info={"model": response.model, **response.metadata}
+        )
         return ChatResult(generations=[[generation]])
 
 
@@ -91,23 +348,152 @@ class CrewAIOrchestrator:
     memory: Optional[ChromaMemoryAdapter] = None
     obsidian: Optional[ObsidianClient] = None
     coordinator: Optional[MultiAgentCoordinator] = None
+    session_factory: Optional[Callable[[], AsyncSession]] = None
+    _background_tasks: Set["asyncio.Task[None]"] = field(
+        default_factory=set, init=False, repr=False
+    )
+    _background_slots: asyncio.Semaphore = field(
+        default_factory=lambda: asyncio.Semaphore(_MAX_BACKGROUND_WRITES), init=False, repr=False
+    )
+    _llm_wrappers: Dict[str, OpenRouterLLMWrapper] = field(
+        default_factory=dict, init=False, repr=False
+    )
+    _default_model: str = field(default="", init=False, repr=False)
+    _fast_path_enabled: bool = field(default=False, init=False, repr=False)
+    _fast_path_max_memory_chars: int = field(default=0, init=False, repr=False)
+    _memory_context_max_chars: int = field(default=0, init=False, repr=False)
+    _exact_token_counting: bool = field(default=False, init=False, repr=False)
+    _conversation_writer: Optional[ConversationWriter] = field(default=None, init=False, repr=False)
+    _inflight: Dict[str, "asyncio.Task[tuple[str, str, str, int]]"] = field(
+        default_factory=dict, init=False, repr=False
+    )
 
     def __post_init__(self) -> None:
         settings = get_settings()
+        # Per-request values read once here instead of on every process_query call.
+        self._default_model = settings.default_model
+        self._fast_path_enabled = settings.fast_path_enabled
+        self._fast_path_max_memory_chars = settings.fast_path_max_memory_chars
+        self._memory_context_max_chars = settings.memory_context_max_chars
+        self._exact_token_counting = settings.exact_token_counting
+        if self.session_factory is None:
+            self.session_factory = AsyncSessionLocal
+        self._conversation_writer = ConversationWriter(self.session_factory)
         if self.llm is None:
             self.llm = OpenRouterLLMAdapter()
         if self.memory is None:
-            self.memory = ChromaMemoryAdapter(
-                host=settings.chroma_host,
-                port=settings.chroma_port,
-                collection_name=settings.chroma_collection_name,
-                persist_directory=settings.chroma_persist_dir,
-            )
+            self.memory = get_memory_manager(settings.chroma_collection_name)
         if self.obsidian is None:
             self.obsidian = ObsidianClient()
         if self.coordinator is None:
             self.coordinator = MultiAgentCoordinator.production(mem0_wrapper=self.memory)
 
+    def _get_llm_wrapper(self, model: str) -> OpenRouterLLMWrapper:
+        """Return the CrewAI-facing LLM for ``model``, built once and sharing ``self.llm``."""
+        wrapper = self._llm_wrappers.get(model)
+        if wrapper is None:
+            wrapper = self._llm_wrappers[model] = OpenRouterLLMWrapper(
+                model=model, adapter=self.llm
+            )
+        return wrapper
+
+    def _spawn(self, coro: Coroutine[Any, Any, None]) -> None:
+        """Run ``coro`` in the background, keeping a reference until it finishes.
+
+        At most ``_MAX_BACKGROUND_WRITES`` of them run at once; the rest wait
+        for a slot so a burst of requests cannot pile up unbounded writes.
+        """
+        task = asyncio.create_task(self._run_background(coro))
+        self._background_tasks.add(task)
+        task.add_done_callback(self._on_background_done)
+
+    async def _run_background(self, coro: Coroutine[Any, Any, None]) -> None:
+        try:
+            async with self._background_slots:
+                await coro
+        finally:
+            # No-op once awaited; avoids a "never awaited" warning if cancelled while queued.
+            coro.close()
+
+    def _on_background_done(self, task: "asyncio.Task[None]") -> None:
+        self._background_tasks.discard(task)
+        if task.cancelled():
+            return
+        exc = task.exception()
+        if exc is not None:
+            logger.error(f"Background persistence failed: {exc}", exc_info=exc)
+
+    async def aclose(self, timeout: Optional[float] = 10.0) -> None:
+        """Wait up to ``timeout`` seconds for pending background persistence.
+
+        Writes still running after that are cancelled so shutdown cannot hang on
+        a stalled database or vector store.
+        """
+        if self._background_tasks:
+            _, pending = await asyncio.wait(set(self._background_tasks), timeout=timeout)
+            if pending:
+                logger.warning(
+                    f"Cancelling {len(pending)} background task(s) still running at shutdown"
+                )
+                for task in pending:
+                    task.cancel()
+                await asyncio.gather(*pending, return_exceptions=True)
+        await self._conversation_writer.aclose(timeout)
+
+    def _store_conversation(
+        self, user_id: UserID, query: Query, answer: str, space_schema: Optional[str]
+    ) -> None:
+        """Queue the user/assistant exchange for persistence.
+
+        The rows are written after the response has been returned, by the
+        conversation writer using its own sessions rather than the
+        request-scoped one, which is closed by then.
+        """
+        self._conversation_writer.put(
+            space_schema,
+            [
+                {
+                    "id": str(uuid4()),
+                    "user_id": user_id,
+                    "role": "user",
+                    "content": query,
+                    "message_metadata": {},
+                },
+                {
+                    "id": str(uuid4()),
+                    "user_id": user_id,
+                    "role": "assistant",
+                    "content": answer,
+                    "message_metadata": {},
+                },
+            ],
+        )
+
+    async def _store_memory(
+        self, memory: ChromaMemoryAdapter, user_id: UserID, query: Query, answer: str
+    ) -> None:
+        await memory.store(
+            user_id=user_id,
+            text=f"Q: {query}\nA: {answer}",
+            metadata={"source": "crewai-assistant"},
+        )
+
+    async def process_queries(
+        self, items: List[Dict[str, Any]], concurrency: int = 8
+    ) -> List[WorkflowResult]:
+        """Process independent queries concurrently, at most ``concurrency`` at a time.
+
+        Each item holds the keyword arguments for :meth:`process_query`; items
+        must not share a database session. Results are returned in input order.
+        """
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def _guarded(item: Dict[str, Any]) -> WorkflowResult:
+            async with semaphore:
+                return await self.process_query(**item)
+
+        return list(await asyncio.gather(*(_guarded(item) for item in items)))
+
     @observe_langsmith(name="process_query")
     async def process_query(
         self,
@@ -117,21 +503,46 @@ class CrewAIOrchestrator:
         context_sources: Optional[List[ContextSource]] = None,
         db: Optional[AsyncSession] = None,
         space_manager: Optional[SpaceManager] = None,
+        stream: Optional["asyncio.Queue[str]"] = None,
         **kwargs,
     ) -> WorkflowResult:
-        """Process a user query through Research → Plan → Implement workflow."""
-        settings = get_settings()
-        model = model or settings.default_model
+        """Process a user query through Research → Plan → Implement workflow.
+
+        When ``stream`` is given and the query takes the single-call path, answer
+        tokens are put on the queue as they arrive; the returned result still
+        carries the full answer.
 
+        Identical concurrent queries (same user, query, model, space and context
+        sources) share a single run of the workflow; each caller still does its
+        own budget check, persistence and usage accounting.
+        """
+        model = model or self._default_model
+        return await self._process_query(
+            user_id, query, model, context_sources, db, space_manager, stream
+        )
+
+    async def _process_query(
+        self,
+        user_id: UserID,
+        query: Query,
+        model: str,
+        context_sources: Optional[List[ContextSource]],
+        db: Optional[AsyncSession],
+        space_manager: Optional[SpaceManager],
+        stream: Optional["asyncio.Queue[str]"],
+    ) -> WorkflowResult:
+        """Run the workflow for a single query; see :meth:`process_query`."""
         space_memory = self.memory
         space_obsidian = self.obsidian
         space_coordinator = self.coordinator
+        space_id = None
         space_schema = None
         tokens_used = 0
 
         if space_manager:
             try:
                 space_config = space_manager.get_current_space()
+                space_id = space_config.space_id
                 space_schema = space_config.postgres_schema
                 usage = await space_manager.get_space_usage(space_config.space_id)
                 remaining = usage.get_budget_remaining(space_config)
@@ -140,80 +551,206 @@ class CrewAIOrchestrator:
                         answer=f"Space budget exceeded. Only {remaining:,} tokens remaining.",
                         metadata={"error": "budget_exceeded", "remaining": remaining},
                     )
-                space_memory = _get_memory_for_space(space_config)
-                space_obsidian = ObsidianClient(vault_path=space_config.obsidian_vault_path)
-                space_coordinator = MultiAgentCoordinator.production(mem0_wrapper=space_memory)
+                space_memory, space_obsidian, space_coordinator = _space_bundle(
+                    space_config.mem0_collection_name, space_config.obsidian_vault_path
+                )
                 if space_config.preferred_model:
                     model = space_config.preferred_model
             except RuntimeError:
                 pass
 
         try:
-            # Retrieve context directly from adapters
-            memories = await space_memory.search(user_id=user_id, query=query, limit=5)
-            memories_text = "\n".join([m.text for m in memories])
-            
-            obsidian_text = ""
-            try:
-                obsidian_results = await space_obsidian.search(query=query, limit=5)
-                obsidian_text = "\n\n".join([r.get("content", "") for r in obsidian_results])
-            except Exception as e:
-                logger.warning(f"Obsidian retrieval failed: {e}")
+            research, plan, answer, api_calls = await self._answer(
+                user_id,
+                query,
+                model,
+                context_sources,
+                space_id,
+                space_memory,
+                space_obsidian,
+                space_coordinator,
+                stream,
+            )
+
+            # Persistence is not needed to produce the answer; overlap it with
+            # the rest of the request instead of blocking the response on it.
+            if db:
+                self._store_conversation(user_id, query, answer, space_schema)
+            self._spawn(self._store_memory(space_memory, user_id, query, answer))
+
+            if space_manager:
+                try:
+                    space_config = space_manager.get_current_space()
+                    total_tokens = _estimate_tokens(
+                        query, research, plan, answer, exact=self._exact_token_counting
+                    )
+                    await space_manager.update_space_usage(
+                        space_id=space_config.space_id,
+                        tokens_used=total_tokens,
+                        api_calls_used=api_calls,
+                        cost_usd=(total_tokens / 1000) * 0.015,
+                    )
+                    tokens_used = total_tokens
+                except Exception as e:
+                    logger.warning(f"Failed to track token usage: {e}")
 
-            llm = OpenRouterLLMWrapper(model=model)
+            return WorkflowResult(
+                answer=answer,
+                research=research,
+                plan=plan,
+                metadata={"model": model, "tokens_used": tokens_used},
+            )
+        except Exception as e:
+            logger.error(f"Error processing query: {e}", exc_info=True)
+            return WorkflowResult(
+                answer=f"I encountered an error processing your query: {str(e)}",
+                metadata={"error": str(e)},
+            )
+
+    async def _answer(
+        self,
+        user_id: UserID,
+        query: Query,
+        model: str,
+        context_sources: Optional[List[ContextSource]],
+        space_id: Optional[str],
+        memory: ChromaMemoryAdapter,
+        obsidian: ObsidianClient,
+        coordinator: MultiAgentCoordinator,
+        stream: Optional["asyncio.Queue[str]"],
+    ) -> tuple[str, str, str, int]:
+        """Research, plan and answer for one query, shared by identical concurrent requests.
+
+        Only this computation is coalesced; budget checks, persistence and usage
+        accounting run per caller on that caller's own session and space manager.
+        """
+        if stream is not None:
+            return await self._compute_answer(
+                user_id, query, model, context_sources, memory, obsidian, coordinator, stream
+            )
+        sources = [source.model_dump() for source in context_sources or []]
+        key = hashlib.sha256(
+            json.dumps([user_id, query, model, space_id, sources], default=str).encode()
+        ).hexdigest()
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.create_task(
+                self._compute_answer(
+                    user_id, query, model, context_sources, memory, obsidian, coordinator, None
+                )
+            )
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        # Shielded so one caller going away does not cancel the run for the others.
+        return await asyncio.shield(task)
+
+    async def _compute_answer(
+        self,
+        user_id: UserID,
+        query: Query,
+        model: str,
+        context_sources: Optional[List[ContextSource]],
+        space_memory: ChromaMemoryAdapter,
+        space_obsidian: ObsidianClient,
+        space_coordinator: MultiAgentCoordinator,
+        stream: Optional["asyncio.Queue[str]"],
+    ) -> tuple[str, str, str, int]:
+        """Retrieve context and run the single-call or crew workflow; returns (research, plan, answer, api_calls)."""
+        # Retrieve context directly from adapters; both lookups are independent I/O,
+        # and a failure in either leaves that context empty rather than failing the query.
+        memories, obsidian_results = await asyncio.gather(
+            space_memory.search(user_id=user_id, query=query, limit=5),
+            space_obsidian.search(query=query, limit=5),
+            return_exceptions=True,
+        )
+        if isinstance(memories, BaseException):
+            logger.warning(f"Memory retrieval failed: {memories}")
+            memories = []
+        if isinstance(obsidian_results, BaseException):
+            logger.warning(f"Obsidian retrieval failed: {obsidian_results}")
+            obsidian_results = []
+        memories_text = _join_memories(memories, self._memory_context_max_chars)
+        obsidian_text = "\n\n".join(c for c in (r.get("content") for r in obsidian_results) if c)
+
+        if (
+            self._fast_path_enabled
+            and not context_sources
+            and len(memories_text) < self._fast_path_max_memory_chars
+        ):
+            # Nothing for the agents' tools to add: one combined call replaces
+            # the three sequential Research → Plan → Implement round-trips.
+            if stream is not None:
+                chunks: List[str] = []
+                prompt = format_context_prompt(
+                    FAST_PATH_STREAM_PROMPT,
+                    _FAST_PATH_STREAM_NO_CONTEXT,
+                    query,
+                    memories_text,
+                    obsidian_text,
+                )
+                messages = [LLMMessage(role="user", content=prompt)]
+                async for chunk in self.llm.stream_chat(messages=messages, model=model):
+                    chunks.append(chunk)
+                    stream.put_nowait(chunk)
+                research, plan, answer = "", "", "".join(chunks)
+            else:
+                prompt = format_context_prompt(
+                    FAST_PATH_PROMPT, _FAST_PATH_NO_CONTEXT, query, memories_text, obsidian_text
+                )
+                messages = [LLMMessage(role="user", content=prompt)]
+                response = await self.llm.chat(messages=messages, model=model)
+                research, plan, answer = _parse_fast_path_response(response.content)
+            api_calls = 1
+        else:
+            Crew, Process, create_agents_for_space, create_tasks_for_workflow = _crew_workflow()
+            llm = self._get_llm_wrapper(model)
             researcher, planner, implementer = create_agents_for_space(
-                memory=space_memory, obsidian=space_obsidian, coordinator=space_coordinator, user_id=user_id, llm=llm, verbose=False
+                memory=space_memory,
+                obsidian=space_obsidian,
+                coordinator=space_coordinator,
+                user_id=user_id,
+                llm=llm,
+                verbose=False,
             )
-            
+
             research_task, plan_task, implement_task = create_tasks_for_workflow(
-                researcher_agent=researcher, planner_agent=planner, implementer_agent=implementer,
-                query=query, memories=memories_text, obsidian_context=obsidian_text
+                researcher_agent=researcher,
+                planner_agent=planner,
+                implementer_agent=implementer,
+                query=query,
+                memories=memories_text,
+                obsidian_context=obsidian_text,
+            )
+
+            crew = Crew(
+                agents=[researcher, planner, implementer],
+                tasks=[research_task, plan_task, implement_task],
+                process=Process.sequential,
+                verbose=False,
             )
-            
-            crew = Crew(agents=[researcher, planner, implementer], tasks=[research_task, plan_task, implement_task], process=Process.sequential, verbose=False)
             result = await asyncio.to_thread(crew.kickoff)
-            
+
             # Extract outputs
-            research = str(research_task.output.raw) if hasattr(research_task, 'output') and research_task.output and hasattr(research_task.output, 'raw') else (str(research_task.output) if hasattr(research_task, 'output') and research_task.output else "")
-            plan = str(plan_task.output.raw) if hasattr(plan_task, 'output') and plan_task.output and hasattr(plan_task.output, 'raw') else (str(plan_task.output) if hasattr(plan_task, 'output') and plan_task.output else "")
-            answer = str(implement_task.output.raw) if hasattr(implement_task, 'output') and implement_task.output and hasattr(implement_task.output, 'raw') else (str(implement_task.output) if hasattr(implement_task, 'output') and implement_task.output else "")
-            
+            research = _task_output_text(research_task)
+            plan = _task_output_text(plan_task)
+            answer = _task_output_text(implement_task)
+
             if not answer:
-                if hasattr(result, 'tasks_output') and result.tasks_output and len(result.tasks_output) >= 3:
-                    research = str(result.tasks_output[0]) if len(result.tasks_output) > 0 else research
+                if (
+                    hasattr(result, "tasks_output")
+                    and result.tasks_output
+                    and len(result.tasks_output) >= 3
+                ):
+                    research = (
+                        str(result.tasks_output[0]) if len(result.tasks_output) > 0 else research
+                    )
                     plan = str(result.tasks_output[1]) if len(result.tasks_output) > 1 else plan
                     answer = str(result.tasks_output[2]) if len(result.tasks_output) > 2 else ""
-                elif hasattr(result, 'raw') and result.raw:
+                elif hasattr(result, "raw") and result.raw:
                     answer = str(result.raw)
                 elif isinstance(result, str):
                     answer = result
                 else:
                     answer = str(result)
-            
-            if db:
-                if space_schema:
-                    await db.execute(text(f'SET search_path TO "{space_schema}", public'))
-                messages = [
-                    ConversationMessage(id=f"{user_id}-{hash(query)}-0", user_id=user_id, role="user", content=query, message_metadata={}),
-                    ConversationMessage(id=f"{user_id}-{hash(query)}-1", user_id=user_id, role="assistant", content=answer, message_metadata={}),
-                ]
-                db.add_all(messages)
-                await db.commit()
-
-            asyncio.create_task(space_memory.store(user_id=user_id, text=f"Q: {query}\nA: {answer}", metadata={"source": "crewai-assistant"}))
-
-            if space_manager:
-                try:
-                    space_config = space_manager.get_current_space()
-                    total_tokens = _estimate_tokens(query) + _estimate_tokens(research) + _estimate_tokens(plan) + _estimate_tokens(answer)
-                    await space_manager.update_space_usage(
-                        space_id=space_config.space_id, tokens_used=total_tokens, api_calls_used=3, cost_usd=(total_tokens / 1000) * 0.015
-                    )
-                    tokens_used = total_tokens
-                except Exception as e:
-                    logger.warning(f"Failed to track token usage: {e}")
-
-            return WorkflowResult(answer=answer, research=research, plan=plan, metadata={"model": model, "tokens_used": tokens_used})
-        except Exception as e:
-            logger.error(f"Error processing query: {e}", exc_info=True)
-            return WorkflowResult(answer=f"I encountered an error processing your query: {str(e)}", metadata={"error": str(e)})
+            api_calls = 3
+        return research, plan, answer, api_calls
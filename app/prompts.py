@@ -0,0 +1,33 @@
+"""Formatting of the prompt templates that take a query, memories and Obsidian context."""
+
+NO_MEMORIES = "No memories found."
+NO_OBSIDIAN_CONTEXT = "No Obsidian context found."
+
+
+def no_context_parts(template: str) -> tuple[str, str]:
+    """Format ``template`` for a request without memories or Obsidian context, split around the query.
+
+    Cold users with no vault are a common shape; their prompts only vary by
+    query, so callers compute this once per template.
+    """
+    head, tail = template.format(
+        query="{query}", memories=NO_MEMORIES, obsidian_context=NO_OBSIDIAN_CONTEXT
+    ).split("{query}")
+    return head, tail
+
+
+def format_context_prompt(
+    template: str, no_context: tuple[str, str], query: str, memories: str, obsidian_context: str
+) -> str:
+    """Fill ``template``, using the precomputed ``no_context`` parts when there is no context."""
+    if not memories and not obsidian_context:
+        head, tail = no_context
+        return f"{head}{query}{tail}"
+    return template.format(
+        query=query,
+        memories=memories or NO_MEMORIES,
+        obsidian_context=obsidian_context or NO_OBSIDIAN_CONTEXT,
+    )
+
+
+__all__ = ["format_context_prompt", "no_context_parts"]
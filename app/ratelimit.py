@@ -0,0 +1,42 @@
+"""Async token-bucket rate limiting."""
+
+import asyncio
+import threading
+import time
+
+
+class AsyncTokenBucket:
+    """Allows bursts of up to ``burst`` calls, refilling at ``rate_per_sec``.
+
+    Callers reserve a token up front and sleep only for their own share of the
+    deficit, so concurrent callers proceed in parallel while the bucket has
+    tokens instead of being serialized behind one another. No asyncio
+    primitives are held, so one bucket can be shared by callers on different
+    event loops (the API loop and the sync bridge thread).
+    """
+
+    def __init__(self, rate_per_sec: float, burst: int) -> None:
+        if rate_per_sec <= 0 or burst < 1:
+            raise ValueError("rate_per_sec must be positive and burst at least 1")
+        self.rate_per_sec = rate_per_sec
+        self.burst = burst
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _reserve(self) -> float:
+        """Take one token, returning how long the caller must wait for it."""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate_per_sec)
+            self._updated = now
+            self._tokens -= 1
+            return -self._tokens / self.rate_per_sec if self._tokens < 0 else 0.0
+
+    async def acquire(self) -> None:
+        delay = self._reserve()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+
+__all__ = ["AsyncTokenBucket"]
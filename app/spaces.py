@@ -2,7 +2,8 @@
 
 import logging
 from dataclasses import dataclass
-from datetime import datetime
+from datetime import datetime, timezone
+from decimal import Decimal
 from enum import Enum
 from pathlib import Path
 from typing import Dict, List, Optional
@@ -12,6 +13,7 @@ from chromadb.config import Settings as ChromaSettings
 from sqlalchemy import select, text
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.adapters.chroma import chroma_collection_metadata
 from app.db import engine
 from app.config import get_settings
 from app.models import SpaceRecord, SpaceUsageRecord
@@ -19,8 +21,14 @@ from app.models import SpaceRecord, SpaceUsageRecord
 logger = logging.getLogger(__name__)
 
 
+def _current_month() -> str:
+    """The current UTC month as "YYYY-MM", the key format of space usage rows."""
+    return datetime.now(timezone.utc).strftime("%Y-%m")
+
+
 class SpaceStatus(Enum):
     """Status of a space."""
+
     ACTIVE = "active"
     ARCHIVED = "archived"
 
@@ -28,6 +36,7 @@ class SpaceStatus(Enum):
 @dataclass
 class SpaceConfig:
     """Configuration blueprint for isolated context."""
+
     space_id: str
     name: str
     owner_id: str
@@ -55,6 +64,7 @@ class SpaceConfig:
 @dataclass
 class SpaceUsage:
     """Usage tracking for a space per month."""
+
     space_id: str
     month: str  # Format: "YYYY-MM"
     tokens_used: int = 0
@@ -81,7 +91,9 @@ class SpaceManager:
     async def create_space(self, config: SpaceConfig) -> SpaceConfig:
         """Create new isolated space."""
         logger.info(f"Creating space: {config.space_id}")
-        existing = await self.db.execute(select(SpaceRecord).where(SpaceRecord.space_id == config.space_id))
+        existing = await self.db.execute(
+            select(SpaceRecord).where(SpaceRecord.space_id == config.space_id)
+        )
         if existing.scalar_one_or_none():
             raise ValueError(f"Space already exists: {config.space_id}")
 
@@ -92,13 +104,17 @@ class SpaceManager:
 
         settings = get_settings()
         if settings.chroma_host:
-            chroma_client = chromadb.HttpClient(host=settings.chroma_host, port=settings.chroma_port)
+            chroma_client = chromadb.HttpClient(
+                host=settings.chroma_host, port=settings.chroma_port
+            )
         else:
             chroma_client = chromadb.PersistentClient(
                 path=settings.chroma_persist_dir or "./chroma_db",
                 settings=ChromaSettings(anonymized_telemetry=False),
             )
-        chroma_client.get_or_create_collection(name=config.mem0_collection_name, metadata={"hnsw:space": "cosine"})
+        chroma_client.get_or_create_collection(
+            name=config.mem0_collection_name, metadata=chroma_collection_metadata()
+        )
 
         async with engine.begin() as conn:
             schema_name = config.postgres_schema.replace('"', '""')
@@ -173,19 +189,21 @@ class SpaceManager:
         spaces = []
         for record in records:
             config_dict = record.config
-            spaces.append(SpaceConfig(
-                space_id=config_dict["space_id"],
-                name=config_dict["name"],
-                owner_id=config_dict["owner_id"],
-                monthly_token_budget=config_dict.get("monthly_token_budget", 1_000_000),
-                monthly_api_calls=config_dict.get("monthly_api_calls", 10_000),
-                obsidian_vault_path=config_dict.get("obsidian_vault_path", ""),
-                mem0_collection_name=config_dict.get("mem0_collection_name", ""),
-                neo4j_graph_name=config_dict.get("neo4j_graph_name", ""),
-                postgres_schema=config_dict.get("postgres_schema", ""),
-                preferred_model=config_dict.get("preferred_model", "openai/gpt-4o-mini"),
-                status=SpaceStatus(record.status),
-            ))
+            spaces.append(
+                SpaceConfig(
+                    space_id=config_dict["space_id"],
+                    name=config_dict["name"],
+                    owner_id=config_dict["owner_id"],
+                    monthly_token_budget=config_dict.get("monthly_token_budget", 1_000_000),
+                    monthly_api_calls=config_dict.get("monthly_api_calls", 10_000),
+                    obsidian_vault_path=config_dict.get("obsidian_vault_path", ""),
+                    mem0_collection_name=config_dict.get("mem0_collection_name", ""),
+                    neo4j_graph_name=config_dict.get("neo4j_graph_name", ""),
+                    postgres_schema=config_dict.get("postgres_schema", ""),
+                    preferred_model=config_dict.get("preferred_model", "openai/gpt-4o-mini"),
+                    status=SpaceStatus(record.status),
+                )
+            )
         return spaces
 
     async def delete_space(self, space_id: str, permanently: bool = False) -> None:
@@ -211,11 +229,12 @@ class SpaceManager:
     async def get_space_usage(self, space_id: str, month: Optional[str] = None) -> SpaceUsage:
         """Get space usage for a specific month."""
         if month is None:
-            now = datetime.utcnow()
-            month = f"{now.year}-{now.month:02d}"
+            month = _current_month()
 
         result = await self.db.execute(
-            select(SpaceUsageRecord).where(SpaceUsageRecord.space_id == space_id, SpaceUsageRecord.month == month)
+            select(SpaceUsageRecord).where(
+                SpaceUsageRecord.space_id == space_id, SpaceUsageRecord.month == month
+            )
         )
         usage_record = result.scalar_one_or_none()
 
@@ -225,30 +244,41 @@ class SpaceManager:
                 month=usage_record.month,
                 tokens_used=usage_record.tokens_used,
                 api_calls_used=usage_record.api_calls_used,
-                cost_usd=float(usage_record.cost_usd),
+                cost_usd=float(usage_record.cost_usd or 0),
             )
         return SpaceUsage(space_id=space_id, month=month)
 
     async def update_space_usage(
-        self, space_id: str, tokens_used: int = 0, api_calls_used: int = 0, cost_usd: float = 0.0, month: Optional[str] = None
+        self,
+        space_id: str,
+        tokens_used: int = 0,
+        api_calls_used: int = 0,
+        cost_usd: float = 0.0,
+        month: Optional[str] = None,
     ) -> None:
         """Update space usage tracking."""
         if month is None:
-            now = datetime.utcnow()
-            month = f"{now.year}-{now.month:02d}"
+            month = _current_month()
 
         result = await self.db.execute(
-            select(SpaceUsageRecord).where(SpaceUsageRecord.space_id == space_id, SpaceUsageRecord.month == month)
+            select(SpaceUsageRecord).where(
+                SpaceUsageRecord.space_id == space_id, SpaceUsageRecord.month == month
+            )
         )
         usage_record = result.scalar_one_or_none()
 
         if usage_record:
             usage_record.tokens_used += tokens_used
             usage_record.api_calls_used += api_calls_used
-            usage_record.cost_usd += cost_usd
+            # The column loads as Decimal, which does not add to a float.
+            usage_record.cost_usd = (usage_record.cost_usd or Decimal(0)) + Decimal(str(cost_usd))
         else:
             usage_record = SpaceUsageRecord(
-                space_id=space_id, month=month, tokens_used=tokens_used, api_calls_used=api_calls_used, cost_usd=cost_usd
+                space_id=space_id,
+                month=month,
+                tokens_used=tokens_used,
+                api_calls_used=api_calls_used,
+                cost_usd=cost_usd,
             )
             self.db.add(usage_record)
         await self.db.commit()
@@ -5,6 +5,7 @@ from typing import AsyncGenerator
 
 from app.adapters.chroma import ChromaMemoryAdapter
 from app.adapters.openrouter import OpenRouterLLMAdapter
+
 # RPIWorkflow removed - production uses LangChain version
 from app.config import Settings
 
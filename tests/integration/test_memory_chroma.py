@@ -30,21 +30,21 @@ def chroma_manager(temp_chroma_dir):
 async def test_store_and_search(chroma_manager: ChromaMemoryAdapter):
     """Test storing and searching memories."""
     user_id = "test_user"
-    
+
     # Store a memory
     await chroma_manager.store(
         user_id=user_id,
         text="I love Python programming",
         metadata={"source": "test"},
     )
-    
+
     # Search for it
     results = await chroma_manager.search(
         user_id=user_id,
         query="Python programming",
         limit=5,
     )
-    
+
     assert len(results) > 0
     assert any("Python" in r.text for r in results)
     assert results[0].metadata.get("source") == "test"
@@ -55,7 +55,7 @@ async def test_user_isolation(chroma_manager: ChromaMemoryAdapter):
     """Test that memories are isolated by user_id."""
     user1 = "user1"
     user2 = "user2"
-    
+
     # Store memories for different users
     await chroma_manager.store(
         user_id=user1,
@@ -67,21 +67,21 @@ async def test_user_isolation(chroma_manager: ChromaMemoryAdapter):
         text="User 2's secret information",
         metadata={"user": "2"},
     )
-    
+
     # Search as user1 - should only see user1's memories
     results1 = await chroma_manager.search(
         user_id=user1,
         query="secret",
         limit=5,
     )
-    
+
     # Search as user2 - should only see user2's memories
     results2 = await chroma_manager.search(
         user_id=user2,
         query="secret",
         limit=5,
     )
-    
+
     # Verify isolation
     assert all(r.metadata.get("user") == "1" for r in results1)
     assert all(r.metadata.get("user") == "2" for r in results2)
@@ -93,7 +93,7 @@ async def test_user_isolation(chroma_manager: ChromaMemoryAdapter):
 async def test_metadata_filtering(chroma_manager: ChromaMemoryAdapter):
     """Test that metadata is stored and retrieved correctly."""
     user_id = "test_user"
-    
+
     await chroma_manager.store(
         user_id=user_id,
         text="Test memory with metadata",
@@ -103,13 +103,13 @@ async def test_metadata_filtering(chroma_manager: ChromaMemoryAdapter):
             "priority": "high",
         },
     )
-    
+
     results = await chroma_manager.search(
         user_id=user_id,
         query="memory",
         limit=5,
     )
-    
+
     assert len(results) > 0
     result = results[0]
     assert result.metadata.get("source") == "test"
@@ -121,7 +121,7 @@ async def test_metadata_filtering(chroma_manager: ChromaMemoryAdapter):
 async def test_search_limit(chroma_manager: ChromaMemoryAdapter):
     """Test that search respects the limit parameter."""
     user_id = "test_user"
-    
+
     # Store multiple memories
     for i in range(10):
         await chroma_manager.store(
@@ -129,14 +129,14 @@ async def test_search_limit(chroma_manager: ChromaMemoryAdapter):
             text=f"Memory {i}: This is test memory number {i}",
             metadata={"index": i},
         )
-    
+
     # Search with limit
     results = await chroma_manager.search(
         user_id=user_id,
         query="test memory",
         limit=3,
     )
-    
+
     assert len(results) <= 3
 
 
@@ -144,7 +144,7 @@ async def test_search_limit(chroma_manager: ChromaMemoryAdapter):
 async def test_similarity_search(chroma_manager: ChromaMemoryAdapter):
     """Test that similarity search returns relevant results."""
     user_id = "test_user"
-    
+
     # Store memories with different topics
     await chroma_manager.store(
         user_id=user_id,
@@ -161,31 +161,34 @@ async def test_similarity_search(chroma_manager: ChromaMemoryAdapter):
         text="JavaScript is used for web development",
         metadata={"topic": "programming"},
     )
-    
+
     # Search for programming-related content
     results = await chroma_manager.search(
         user_id=user_id,
         query="programming languages",
         limit=5,
     )
-    
+
     # Should return programming-related memories first
     assert len(results) > 0
     # At least one result should be about programming
-    assert any("programming" in r.text.lower() or "Python" in r.text or "JavaScript" in r.text for r in results)
+    assert any(
+        "programming" in r.text.lower() or "Python" in r.text or "JavaScript" in r.text
+        for r in results
+    )
 
 
 @pytest.mark.asyncio
 async def test_empty_search(chroma_manager: ChromaMemoryAdapter):
     """Test searching when no memories exist."""
     user_id = "new_user"
-    
+
     results = await chroma_manager.search(
         user_id=user_id,
         query="anything",
         limit=5,
     )
-    
+
     # Should return empty list, not error
     assert isinstance(results, list)
     assert len(results) == 0
@@ -195,27 +198,27 @@ async def test_empty_search(chroma_manager: ChromaMemoryAdapter):
 async def test_multiple_stores(chroma_manager: ChromaMemoryAdapter):
     """Test storing multiple memories for the same user."""
     user_id = "test_user"
-    
+
     memories = [
         "First memory about Python",
         "Second memory about JavaScript",
         "Third memory about Rust",
     ]
-    
+
     for memory in memories:
         await chroma_manager.store(
             user_id=user_id,
             text=memory,
             metadata={"source": "batch_test"},
         )
-    
+
     # Search should return multiple results
     results = await chroma_manager.search(
         user_id=user_id,
         query="programming",
         limit=10,
     )
-    
+
     assert len(results) >= 3
     texts = [r.text for r in results]
     assert any("Python" in text for text in texts)
@@ -41,5 +41,3 @@ def test_chat_accepts_context_sources(monkeypatch: Any) -> None:
     assert response.status_code == 200
     assert response.json()["answer"] == "ok"
     assert captured["context_sources"] == [{"type": "DIRECTORY", "path": "./src"}]
-
-
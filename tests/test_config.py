@@ -6,5 +6,3 @@ def test_load_settings_has_defaults() -> None:
 
     assert settings.openrouter_api_key != ""
     assert settings.database_url.startswith("postgresql")
-
-
@@ -1,10 +1,18 @@
 """Tests to validate CrewAIOrchestrator behavior."""
 
+import asyncio
+
 import pytest
+from sqlalchemy.exc import IntegrityError, ProgrammingError
 from unittest.mock import AsyncMock, MagicMock, patch
 
-from app.orchestrator import CrewAIOrchestrator
-from app.core import ContextSource
+from app.orchestrator import (
+    ConversationWriter,
+    CrewAIOrchestrator,
+    _join_memories,
+    _parse_fast_path_response,
+)
+from app.core import ContextSource, Memory, WorkflowResult
 
 
 @pytest.fixture
@@ -31,7 +39,7 @@ async def test_orchestrator_accepts_inputs(
     user_id = "test_user"
     query = "What is Python?"
     model = "openai/gpt-4o-mini"
-    
+
     # Mock the LLM calls to avoid actual API calls
     with patch("app.adapters.openrouter.OpenRouterLLMAdapter.chat") as mock_llm:
         mock_response = MagicMock()
@@ -39,7 +47,7 @@ async def test_orchestrator_accepts_inputs(
         mock_response.model = model
         mock_response.metadata = {}
         mock_llm.return_value = mock_response
-        
+
         # Test CrewAIOrchestrator
         try:
             result = await crewai_orchestrator.process_query(
@@ -64,14 +72,14 @@ async def test_orchestrator_output_format(
     user_id = "test_user"
     query = "Explain machine learning"
     model = "openai/gpt-4o-mini"
-    
+
     with patch("app.adapters.openrouter.OpenRouterLLMAdapter.chat") as mock_llm:
         mock_response = MagicMock()
         mock_response.content = "Machine learning is a subset of AI."
         mock_response.model = model
         mock_response.metadata = {}
         mock_llm.return_value = mock_response
-        
+
         try:
             result = await crewai_orchestrator.process_query(
                 user_id=user_id,
@@ -98,14 +106,14 @@ async def test_context_sources_support(
     context_sources = [
         ContextSource(type="FILE", path="/path/to/file.py"),
     ]
-    
+
     with patch("app.adapters.openrouter.OpenRouterLLMAdapter.chat") as mock_llm:
         mock_response = MagicMock()
         mock_response.content = "Code analysis complete."
         mock_response.model = model
         mock_response.metadata = {}
         mock_llm.return_value = mock_response
-        
+
         try:
             result = await crewai_orchestrator.process_query(
                 user_id=user_id,
@@ -128,10 +136,10 @@ async def test_memory_integration(
     user_id = "test_user"
     query = "What did we discuss about Python?"
     model = "openai/gpt-4o-mini"
-    
+
     # Orchestrator should use memory manager interface
     assert hasattr(crewai_orchestrator, "memory")
-    
+
     # Should have store and search methods
     assert hasattr(crewai_orchestrator.memory, "store")
     assert hasattr(crewai_orchestrator.memory, "search")
@@ -146,11 +154,11 @@ async def test_error_handling(
     user_id = "test_user"
     query = "Test query"
     model = "openai/gpt-4o-mini"
-    
+
     # Simulate an error in LLM call
     with patch("app.adapters.openrouter.OpenRouterLLMAdapter.chat") as mock_llm:
         mock_llm.side_effect = Exception("LLM API error")
-        
+
         try:
             result = await crewai_orchestrator.process_query(
                 user_id=user_id,
@@ -169,13 +177,13 @@ async def test_error_handling(
 def test_orchestrator_interface():
     """Test that orchestrator has required interface."""
     unified = CrewAIOrchestrator()
-    
+
     # Should have process_query method
     assert hasattr(unified, "process_query")
-    
+
     # Should have memory attribute
     assert hasattr(unified, "memory")
-    
+
     # Should have llm attribute
     assert hasattr(unified, "llm")
 
@@ -189,11 +197,11 @@ async def test_rpi_workflow_structure(
     user_id = "test_user"
     query = "Build a web scraper"
     model = "openai/gpt-4o-mini"
-    
+
     with patch("app.adapters.openrouter.OpenRouterLLMAdapter.chat") as mock_llm:
         # Mock different responses for research, plan, and implement phases
         call_count = 0
-        
+
         def mock_llm_response(*args, **kwargs):
             nonlocal call_count
             call_count += 1
@@ -215,9 +223,9 @@ async def test_rpi_workflow_structure(
                 response.model = model
                 response.metadata = {}
                 return response
-        
+
         mock_llm.side_effect = mock_llm_response
-        
+
         try:
             result = await crewai_orchestrator.process_query(
                 user_id=user_id,
@@ -232,3 +240,252 @@ async def test_rpi_workflow_structure(
             assert mock_llm.call_count >= 1
         except Exception as e:
             pytest.skip(f"CrewAIOrchestrator RPI test skipped: {e}")
+
+
+@pytest.mark.asyncio
+async def test_process_queries_bounds_concurrency(
+    crewai_orchestrator: CrewAIOrchestrator,
+    monkeypatch,
+):
+    """Test that batch processing preserves order and respects the concurrency limit."""
+    active = 0
+    peak = 0
+
+    async def fake_process_query(**kwargs):
+        nonlocal active, peak
+        active += 1
+        peak = max(peak, active)
+        await asyncio.sleep(0.01)
+        active -= 1
+        return WorkflowResult(answer=kwargs["query"])
+
+    monkeypatch.setattr(crewai_orchestrator, "process_query", fake_process_query)
+
+    items = [{"user_id": "test_user", "query": f"q{i}"} for i in range(6)]
+    results = await crewai_orchestrator.process_queries(items, concurrency=2)
+
+    assert [r.answer for r in results] == [f"q{i}" for i in range(6)]
+    assert peak == 2
+
+
+@pytest.mark.asyncio
+async def test_crew_runs_when_fast_path_disabled(
+    crewai_orchestrator: CrewAIOrchestrator, monkeypatch
+):
+    """With the fast path off, a query without context sources still goes through the crew."""
+    crewai_orchestrator._fast_path_enabled = False
+    kickoffs = []
+    tasks = [MagicMock(output=MagicMock(raw=text)) for text in ("research", "plan", "answer")]
+
+    class FakeCrew:
+        def __init__(self, **kwargs):
+            pass
+
+        def kickoff(self):
+            kickoffs.append(True)
+            return "answer"
+
+    workflow = (
+        FakeCrew,
+        MagicMock(),
+        MagicMock(return_value=(MagicMock(), MagicMock(), MagicMock())),
+        MagicMock(return_value=tasks),
+    )
+    monkeypatch.setattr("app.orchestrator._crew_workflow", lambda: workflow)
+    monkeypatch.setattr(crewai_orchestrator.memory, "search", AsyncMock(return_value=[]))
+    monkeypatch.setattr(crewai_orchestrator.obsidian, "search", AsyncMock(return_value=[]))
+    monkeypatch.setattr(crewai_orchestrator, "_store_memory", AsyncMock())
+    crewai_orchestrator.llm.chat = AsyncMock(side_effect=AssertionError("fast path must not run"))
+
+    result = await crewai_orchestrator.process_query(user_id="u", query="What is Python?")
+
+    assert kickoffs == [True]
+    assert (result.research, result.plan, result.answer) == ("research", "plan", "answer")
+
+
+def test_parse_fast_path_response():
+    """Fast-path completions split into research/plan/answer, falling back to the raw text."""
+    fenced = '```json\n{"research": "r", "plan": "p", "answer": "a"}\n```'
+    assert _parse_fast_path_response(fenced) == ("r", "p", "a")
+    assert _parse_fast_path_response("Just an answer.") == ("", "", "Just an answer.")
+    assert _parse_fast_path_response('{"research": "r"}') == ("", "", '{"research": "r"}')
+
+
+def test_join_memories_dedupes_within_budget():
+    """Duplicate memories are dropped and entries past the budget skipped."""
+    memories = [
+        Memory(text="Likes Python", metadata={}),
+        Memory(text="likes  python", metadata={}),
+        Memory(text="x" * 50, metadata={}),
+        Memory(text="Uses vim", metadata={}),
+    ]
+    assert _join_memories(memories, max_chars=30) == "Likes Python\nUses vim"
+
+
+@pytest.mark.asyncio
+async def test_aclose_cancels_stalled_background_tasks(
+    crewai_orchestrator: CrewAIOrchestrator,
+):
+    """aclose() waits for background writes but cancels those past the timeout."""
+    finished = []
+
+    async def quick():
+        finished.append("quick")
+
+    async def stalled():
+        await asyncio.sleep(60)
+
+    crewai_orchestrator._spawn(quick())
+    crewai_orchestrator._spawn(stalled())
+    await crewai_orchestrator.aclose(timeout=0.1)
+
+    assert finished == ["quick"]
+    assert not crewai_orchestrator._background_tasks
+
+
+@pytest.mark.asyncio
+async def test_conversation_writer_batches_rows():
+    """Rows queued close together are written in one transaction per schema."""
+    executed = []
+
+    class FakeSession:
+        async def __aenter__(self):
+            return self
+
+        async def __aexit__(self, *exc):
+            return False
+
+        async def execute(self, statement, params=None):
+            if params is not None:
+                executed.append(len(params))
+
+        async def commit(self):
+            pass
+
+    writer = ConversationWriter(FakeSession, max_delay=0.05)
+    writer.put(None, [{"id": "a"}, {"id": "b"}])
+    writer.put(None, [{"id": "c"}, {"id": "d"}])
+    writer.put("space_x", [{"id": "e"}, {"id": "f"}])
+    await writer.aclose()
+
+    assert sorted(executed) == [2, 4]
+
+
+@pytest.mark.asyncio
+async def test_conversation_writer_isolates_failing_rows():
+    """A bad exchange or schema does not lose the other conversations in the batch."""
+    written = []
+
+    class FakeSession:
+        async def __aenter__(self):
+            return self
+
+        async def __aexit__(self, *exc):
+            return False
+
+        async def execute(self, statement, params=None):
+            if params is None:
+                if "missing" in str(statement):
+                    raise ProgrammingError("SET", {}, Exception("schema does not exist"))
+                return
+            if any(row["id"] == "bad" for row in params):
+                raise IntegrityError("INSERT", {}, Exception("duplicate key"))
+            written.extend(row["id"] for row in params)
+
+        async def commit(self):
+            pass
+
+        async def rollback(self):
+            pass
+
+    writer = ConversationWriter(FakeSession, max_delay=0.05)
+    writer.put(None, [{"id": "a"}, {"id": "b"}])
+    writer.put(None, [{"id": "bad"}, {"id": "c"}])
+    writer.put("missing", [{"id": "d"}, {"id": "e"}])
+    writer.put(None, [{"id": "f"}, {"id": "g"}])
+    await writer.aclose()
+
+    assert written == ["a", "b", "f", "g"]
+
+
+@pytest.mark.asyncio
+async def test_identical_concurrent_queries_are_coalesced(
+    crewai_orchestrator: CrewAIOrchestrator,
+    monkeypatch,
+):
+    """Concurrent identical queries share one workflow run."""
+    calls = 0
+
+    async def fake_compute_answer(user_id, query, *args):
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return "", "", query, 1
+
+    monkeypatch.setattr(crewai_orchestrator, "_compute_answer", fake_compute_answer)
+    monkeypatch.setattr(crewai_orchestrator, "_store_memory", AsyncMock())
+
+    results = await asyncio.gather(
+        crewai_orchestrator.process_query(user_id="u", query="same"),
+        crewai_orchestrator.process_query(user_id="u", query="same"),
+        crewai_orchestrator.process_query(user_id="u", query="other"),
+    )
+
+    assert [r.answer for r in results] == ["same", "same", "other"]
+    assert calls == 2
+    assert not crewai_orchestrator._inflight
+
+
+def _space_manager() -> MagicMock:
+    space_config = MagicMock(space_id="space_1", postgres_schema="space_1", preferred_model=None)
+    usage = MagicMock()
+    usage.get_budget_remaining.return_value = 1_000_000
+    space_manager = MagicMock()
+    space_manager.get_current_space.return_value = space_config
+    space_manager.get_space_usage = AsyncMock(return_value=usage)
+    space_manager.update_space_usage = AsyncMock()
+    return space_manager
+
+
+@pytest.mark.asyncio
+async def test_coalesced_queries_persist_and_charge_each_caller(
+    crewai_orchestrator: CrewAIOrchestrator,
+    mock_db,
+    monkeypatch,
+):
+    """Callers sharing a workflow run each queue their conversation and record their own usage."""
+    calls = 0
+
+    async def fake_compute_answer(user_id, query, *args):
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return "research", "plan", "answer", 3
+
+    queued = []
+    monkeypatch.setattr(crewai_orchestrator, "_compute_answer", fake_compute_answer)
+    monkeypatch.setattr(crewai_orchestrator, "_store_memory", AsyncMock())
+    monkeypatch.setattr(
+        crewai_orchestrator._conversation_writer,
+        "put",
+        lambda schema, rows: queued.append((schema, rows)),
+    )
+    monkeypatch.setattr(
+        "app.orchestrator._space_bundle", lambda *args: (MagicMock(), MagicMock(), MagicMock())
+    )
+    first, second = _space_manager(), _space_manager()
+
+    results = await asyncio.gather(
+        crewai_orchestrator.process_query(
+            user_id="u", query="same", db=mock_db, space_manager=first
+        ),
+        crewai_orchestrator.process_query(
+            user_id="u", query="same", db=mock_db, space_manager=second
+        ),
+    )
+
+    assert [r.answer for r in results] == ["answer", "answer"]
+    assert calls == 1
+    assert [schema for schema, _ in queued] == ["space_1", "space_1"]
+    first.update_space_usage.assert_awaited_once()
+    second.update_space_usage.assert_awaited_once()
@@ -1,12 +1,15 @@
 """Integration tests for ChromaMemoryAdapter."""
 
+import asyncio
 import os
 import pytest
 import tempfile
 import shutil
 from typing import Dict, Any
 
+from app.adapters import chroma
 from app.adapters.chroma import ChromaMemoryAdapter
+from app.core import Memory
 
 
 @pytest.fixture
@@ -30,21 +33,21 @@ def chroma_manager(temp_chroma_dir):
 async def test_store_and_search(chroma_manager: ChromaMemoryAdapter):
     """Test storing and searching memories."""
     user_id = "test_user"
-    
+
     # Store a memory
     await chroma_manager.store(
         user_id=user_id,
         text="I love Python programming",
         metadata={"source": "test"},
     )
-    
+
     # Search for it
     results = await chroma_manager.search(
         user_id=user_id,
         query="Python programming",
         limit=5,
     )
-    
+
     assert len(results) > 0
     assert any("Python" in r.text for r in results)
     assert results[0].metadata.get("source") == "test"
@@ -55,7 +58,7 @@ async def test_user_isolation(chroma_manager: ChromaMemoryAdapter):
     """Test that memories are isolated by user_id."""
     user1 = "user1"
     user2 = "user2"
-    
+
     # Store memories for different users
     await chroma_manager.store(
         user_id=user1,
@@ -67,21 +70,21 @@ async def test_user_isolation(chroma_manager: ChromaMemoryAdapter):
         text="User 2's secret information",
         metadata={"user": "2"},
     )
-    
+
     # Search as user1 - should only see user1's memories
     results1 = await chroma_manager.search(
         user_id=user1,
         query="secret",
         limit=5,
     )
-    
+
     # Search as user2 - should only see user2's memories
     results2 = await chroma_manager.search(
         user_id=user2,
         query="secret",
         limit=5,
     )
-    
+
     # Verify isolation
     assert all(r.metadata.get("user") == "1" for r in results1)
     assert all(r.metadata.get("user") == "2" for r in results2)
@@ -93,7 +96,7 @@ async def test_user_isolation(chroma_manager: ChromaMemoryAdapter):
 async def test_metadata_filtering(chroma_manager: ChromaMemoryAdapter):
     """Test that metadata is stored and retrieved correctly."""
     user_id = "test_user"
-    
+
     await chroma_manager.store(
         user_id=user_id,
         text="Test memory with metadata",
@@ -103,13 +106,13 @@ async def test_metadata_filtering(chroma_manager: ChromaMemoryAdapter):
             "priority": "high",
         },
     )
-    
+
     results = await chroma_manager.search(
         user_id=user_id,
         query="memory",
         limit=5,
     )
-    
+
     assert len(results) > 0
     result = results[0]
     assert result.metadata.get("source") == "test"
@@ -121,7 +124,7 @@ async def test_metadata_filtering(chroma_manager: ChromaMemoryAdapter):
 async def test_search_limit(chroma_manager: ChromaMemoryAdapter):
     """Test that search respects the limit parameter."""
     user_id = "test_user"
-    
+
     # Store multiple memories
     for i in range(10):
         await chroma_manager.store(
@@ -129,14 +132,14 @@ async def test_search_limit(chroma_manager: ChromaMemoryAdapter):
             text=f"Memory {i}: This is test memory number {i}",
             metadata={"index": i},
         )
-    
+
     # Search with limit
     results = await chroma_manager.search(
         user_id=user_id,
         query="test memory",
         limit=3,
     )
-    
+
     assert len(results) <= 3
 
 
@@ -144,7 +147,7 @@ async def test_search_limit(chroma_manager: ChromaMemoryAdapter):
 async def test_similarity_search(chroma_manager: ChromaMemoryAdapter):
     """Test that similarity search returns relevant results."""
     user_id = "test_user"
-    
+
     # Store memories with different topics
     await chroma_manager.store(
         user_id=user_id,
@@ -161,31 +164,34 @@ async def test_similarity_search(chroma_manager: ChromaMemoryAdapter):
         text="JavaScript is used for web development",
         metadata={"topic": "programming"},
     )
-    
+
     # Search for programming-related content
     results = await chroma_manager.search(
         user_id=user_id,
         query="programming languages",
         limit=5,
     )
-    
+
     # Should return programming-related memories first
     assert len(results) > 0
     # At least one result should be about programming
-    assert any("programming" in r.text.lower() or "Python" in r.text or "JavaScript" in r.text for r in results)
+    assert any(
+        "programming" in r.text.lower() or "Python" in r.text or "JavaScript" in r.text
+        for r in results
+    )
 
 
 @pytest.mark.asyncio
 async def test_empty_search(chroma_manager: ChromaMemoryAdapter):
     """Test searching when no memories exist."""
     user_id = "new_user"
-    
+
     results = await chroma_manager.search(
         user_id=user_id,
         query="anything",
         limit=5,
     )
-    
+
     # Should return empty list, not error
     assert isinstance(results, list)
     assert len(results) == 0
@@ -195,28 +201,124 @@ async def test_empty_search(chroma_manager: ChromaMemoryAdapter):
 async def test_multiple_stores(chroma_manager: ChromaMemoryAdapter):
     """Test storing multiple memories for the same user."""
     user_id = "test_user"
-    
+
     memories = [
         "First memory about Python",
         "Second memory about JavaScript",
         "Third memory about Rust",
     ]
-    
+
     for memory in memories:
         await chroma_manager.store(
             user_id=user_id,
             text=memory,
             metadata={"source": "batch_test"},
         )
-    
+
     # Search should return multiple results
     results = await chroma_manager.search(
         user_id=user_id,
         query="programming",
         limit=10,
     )
-    
+
     assert len(results) >= 3
     texts = [r.text for r in results]
     assert any("Python" in text for text in texts)
     assert any("JavaScript" in text for text in texts)
+
+
+@pytest.mark.asyncio
+async def test_concurrent_embeddings_share_one_request(monkeypatch):
+    """Concurrent single-text embeddings are sent to the API as one batch."""
+    calls = []
+
+    async def fake_get_embeddings(texts, model="text-embedding-3-small"):
+        calls.append(list(texts))
+        return [[float(len(t))] for t in texts]
+
+    monkeypatch.setattr(chroma, "_get_embeddings", fake_get_embeddings)
+    batcher = chroma._EmbeddingBatcher()
+
+    results = await asyncio.gather(batcher.embed("a"), batcher.embed("bb"), batcher.embed("ccc"))
+
+    assert results == [[1.0], [2.0], [3.0]]
+    assert calls == [["a", "bb", "ccc"]]
+
+
+@pytest.mark.asyncio
+async def test_short_embedding_response_fails_every_caller(monkeypatch):
+    """A batch answered with too few vectors errors out instead of hanging callers."""
+
+    async def fake_get_embeddings(texts, model="text-embedding-3-small"):
+        return [[1.0]]
+
+    monkeypatch.setattr(chroma, "_get_embeddings", fake_get_embeddings)
+    batcher = chroma._EmbeddingBatcher()
+
+    results = await asyncio.wait_for(
+        asyncio.gather(batcher.embed("a"), batcher.embed("b"), return_exceptions=True), timeout=1.0
+    )
+
+    assert all(isinstance(r, ValueError) for r in results)
+
+
+@pytest.mark.asyncio
+async def test_embedding_cache_dedupes_and_counts(monkeypatch):
+    """Repeated and concurrent lookups of one text embed it once."""
+    calls = []
+
+    async def fake_get_embeddings(texts, model="text-embedding-3-small"):
+        calls.append(list(texts))
+        return [[1.0] for _ in texts]
+
+    monkeypatch.setattr(chroma, "_get_embeddings", fake_get_embeddings)
+    cache = chroma._EmbeddingCache()
+
+    await asyncio.gather(cache.get("same"), cache.get("same"))
+    await cache.get("same")
+
+    assert calls == [["same"]]
+    assert cache.stats.hits == 1
+    assert cache.stats.misses == 2
+
+
+@pytest.mark.asyncio
+async def test_concurrent_identical_searches_share_one_query(
+    chroma_manager: ChromaMemoryAdapter, monkeypatch
+):
+    """Identical searches issued together run the uncached search once."""
+    calls = []
+
+    async def no_cache(*args, **kwargs):
+        return None
+
+    async def fake_search(user_id, query, limit, where, key, cache_key, cache_kwargs):
+        calls.append(query)
+        await asyncio.sleep(0.01)
+        return [Memory(text="hit", metadata={})]
+
+    monkeypatch.setattr(chroma, "_get_cached", no_cache)
+    monkeypatch.setattr(chroma_manager, "_search", fake_search)
+
+    results = await asyncio.gather(*(chroma_manager.search("user", "same query") for _ in range(3)))
+
+    assert calls == ["same query"]
+    assert all(r[0].text == "hit" for r in results)
+    assert not chroma_manager._search_inflight
+
+
+@pytest.mark.asyncio
+async def test_list_memories_skips_embedding(chroma_manager: ChromaMemoryAdapter, monkeypatch):
+    """Listing a user's memories does not embed a query."""
+    await chroma_manager.store(
+        user_id="lister", text="Remember the milk", metadata={"source": "test"}
+    )
+
+    async def fail_embed(text):
+        raise AssertionError("list_memories must not embed")
+
+    monkeypatch.setattr(chroma, "_embed_cached", fail_embed)
+    results = await chroma_manager.list_memories(user_id="lister", limit=10)
+
+    assert [r.text for r in results] == ["Remember the milk"]
@@ -1,3 +1,11 @@
+import asyncio
+import os
+
+import httpx
+import pytest
+
+from app import multi_agent_context_system as macs
+from app.crewai import run_tool_batch
 from app.multi_agent_context_system import (
     ContextSource,
     ContextSourceType,
@@ -8,6 +16,7 @@ from app.multi_agent_context_system import (
     MemoryRetrieverAgent,
     MultiAgentCoordinator,
     SynthesizerAgent,
+    _list_dir,
 )
 
 
@@ -105,3 +114,138 @@ def test_multi_agent_coordinator_default_research() -> None:
     assert "Retrieved memory context" in research
 
 
+@pytest.mark.asyncio
+async def test_run_tool_batch_runs_calls_concurrently_with_timeouts() -> None:
+    coord = MultiAgentCoordinator.default()
+
+    async def slow_fetch(urls):
+        await asyncio.sleep(1)
+        return "too late"
+
+    coord.link_agent = LinkCrawlerAgent(fetch_urls=slow_fetch)
+    results = await run_tool_batch(
+        coord,
+        [
+            ("memory_retriever", "auth-mem:login"),
+            ("link_crawler", "https://example.com"),
+            ("nope", "x"),
+        ],
+        timeout=0.05,
+    )
+    assert "Retrieved memory context" in results[0]
+    assert "timed out" in results[1]
+    assert results[2] == "Unknown tool: nope"
+
+
+def test_file_head_cache_rereads_changed_files(tmp_path, monkeypatch) -> None:
+    reads = []
+    real_read = macs._read_file_head
+
+    def counting_read(path):
+        reads.append(path)
+        return real_read(path)
+
+    monkeypatch.setattr(macs, "_read_file_head", counting_read)
+    target = tmp_path / "notes.txt"
+    target.write_text("first")
+
+    assert macs._read_file_head_cached(str(target)) == ("first", False)
+    assert macs._read_file_head_cached(str(target)) == ("first", False)
+    assert len(reads) == 1
+
+    target.write_text("second version")
+    assert macs._read_file_head_cached(str(target)) == ("second version", False)
+    assert len(reads) == 2
+
+
+@pytest.mark.asyncio
+async def test_fetch_urls_revalidates_with_etag(monkeypatch) -> None:
+    seen_headers = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        seen_headers.append(request.headers.get("if-none-match"))
+        if request.headers.get("if-none-match") == '"v1"':
+            return httpx.Response(304)
+        return httpx.Response(200, text="page body", headers={"ETag": '"v1"'})
+
+    client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    monkeypatch.setattr(macs, "_get_url_fetcher", lambda: (client, asyncio.Semaphore(4)))
+    monkeypatch.setattr(macs, "_URL_FRESH_SECONDS", 0.0)
+    macs._url_cache.clear()
+    fetch_urls = MultiAgentCoordinator.production().link_agent.fetch_urls
+
+    first = await fetch_urls(["https://example.test/doc"])
+    second = await fetch_urls(["https://example.test/doc"])
+    await client.aclose()
+
+    assert "page body" in first
+    assert second == first
+    assert seen_headers == [None, '"v1"']
+
+
+@pytest.mark.asyncio
+async def test_research_with_context_bounds_slow_agents(monkeypatch) -> None:
+    monkeypatch.setitem(macs._AGENT_TIMEOUTS, "link", 0.01)
+
+    async def slow_fetch(urls):
+        await asyncio.sleep(1)
+        return "never"
+
+    coordinator = MultiAgentCoordinator.default()
+    coordinator.link_agent = LinkCrawlerAgent(fetch_urls=slow_fetch)
+    spec = ContextSpecification(
+        query="q",
+        sources=[
+            ContextSource(type=ContextSourceType.URL, path="https://example.test"),
+            ContextSource(type=ContextSourceType.DATABASE, path="postgresql://db"),
+        ],
+    )
+
+    out = await coordinator.research_with_context(spec)
+
+    assert "link agent timed out" in out
+    assert "Database Findings" in out
+
+
+@pytest.mark.asyncio
+async def test_agents_dedupe_sources_before_dispatch() -> None:
+    captured = {}
+
+    async def fake_fetch(urls):
+        captured["urls"] = list(urls)
+        return "docs"
+
+    agent = LinkCrawlerAgent(fetch_urls=fake_fetch)
+    sources = [
+        ContextSource(type=ContextSourceType.URL, path="https://Example.com:443/docs"),
+        ContextSource(type=ContextSourceType.URL, path="https://example.com/docs"),
+        ContextSource(type=ContextSourceType.API, path="https://api.example.com/v1"),
+    ]
+
+    await agent.run(sources, query="q")
+
+    assert captured["urls"] == ["https://Example.com:443/docs", "https://api.example.com/v1"]
+
+
+def test_list_dir_skips_symlinked_directories(tmp_path) -> None:
+    (tmp_path / "sub").mkdir()
+    (tmp_path / "sub" / "a.txt").write_text("a")
+    (tmp_path / "top.txt").write_text("t")
+    (tmp_path / "link").symlink_to(tmp_path / "sub", target_is_directory=True)
+
+    assert sorted(_list_dir(str(tmp_path), 10)) == [os.path.join("sub", "a.txt"), "top.txt"]
+
+
+@pytest.mark.skipif(
+    hasattr(os, "geteuid") and os.geteuid() == 0, reason="root can read any directory"
+)
+def test_list_dir_skips_unreadable_subdirectories(tmp_path) -> None:
+    locked = tmp_path / "locked"
+    locked.mkdir()
+    (locked / "hidden.txt").write_text("h")
+    (tmp_path / "top.txt").write_text("t")
+    locked.chmod(0)
+    try:
+        assert _list_dir(str(tmp_path), 10) == ["top.txt"]
+    finally:
+        locked.chmod(0o755)
@@ -0,0 +1,32 @@
+"""Tests for the async token bucket."""
+
+import asyncio
+import time
+
+import pytest
+
+from app.ratelimit import AsyncTokenBucket
+
+
+@pytest.mark.asyncio
+async def test_burst_is_not_delayed():
+    """Calls within the burst size proceed immediately and concurrently."""
+    bucket = AsyncTokenBucket(rate_per_sec=1.0, burst=5)
+    start = time.monotonic()
+    await asyncio.gather(*(bucket.acquire() for _ in range(5)))
+    assert time.monotonic() - start < 0.1
+
+
+@pytest.mark.asyncio
+async def test_calls_beyond_burst_wait_for_refill():
+    """Each call past the burst waits for its own share of the refill."""
+    bucket = AsyncTokenBucket(rate_per_sec=20.0, burst=1)
+    start = time.monotonic()
+    await asyncio.gather(*(bucket.acquire() for _ in range(3)))
+    elapsed = time.monotonic() - start
+    assert 0.08 <= elapsed < 0.5
+
+
+def test_rejects_invalid_configuration():
+    with pytest.raises(ValueError):
+        AsyncTokenBucket(rate_per_sec=0, burst=1)
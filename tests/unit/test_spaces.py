@@ -143,9 +143,9 @@ class TestSpaceManager:
             owner_id="user123",
         )
 
-        with patch("app.spaces.Path") as mock_path, \
-             patch("app.spaces.chromadb") as mock_chroma, \
-             patch("app.spaces.engine") as mock_engine:
+        with patch("app.spaces.Path") as mock_path, patch(
+            "app.spaces.chromadb"
+        ) as mock_chroma, patch("app.spaces.engine") as mock_engine:
             # Mock directory creation
             mock_vault_path = MagicMock()
             mock_path.return_value = mock_vault_path
@@ -188,9 +188,7 @@ class TestSpaceManager:
             await space_manager.create_space(config)
 
     @pytest.mark.asyncio
-    async def test_switch_space_from_cache(
-        self, space_manager: SpaceManager
-    ) -> None:
+    async def test_switch_space_from_cache(self, space_manager: SpaceManager) -> None:
         """Test switching to a space that's in cache."""
         config = SpaceConfig(
             space_id="test_space",
@@ -0,0 +1,56 @@
+"""Tests for the sync-to-async bridge."""
+
+import asyncio
+import threading
+
+import pytest
+
+from app._sync_bridge import aclose_per_loop, run_coro
+
+
+async def _current_thread_name() -> str:
+    await asyncio.sleep(0)
+    return threading.current_thread().name
+
+
+def test_run_coro_reuses_one_loop_thread():
+    """Successive calls run on the same background loop thread."""
+    first = run_coro(_current_thread_name())
+    second = run_coro(_current_thread_name())
+    assert first == second == "mera-sync-runner"
+
+
+@pytest.mark.asyncio
+async def test_run_coro_from_thread_with_running_loop():
+    """Callers inside a running loop (via a worker thread) still get results."""
+    assert await asyncio.to_thread(run_coro, _current_thread_name()) == "mera-sync-runner"
+
+
+def test_run_coro_propagates_exceptions():
+    """Exceptions raised by the coroutine surface to the caller."""
+
+    async def boom():
+        raise ValueError("boom")
+
+    with pytest.raises(ValueError):
+        run_coro(boom())
+
+
+@pytest.mark.asyncio
+async def test_aclose_per_loop_closes_each_resource_on_its_own_loop():
+    """Resources created on the bridge loop are closed there, not on the caller's loop."""
+
+    async def current_loop():
+        return asyncio.get_running_loop()
+
+    bridge_loop = run_coro(current_loop())
+    resources = {asyncio.get_running_loop(): "api", bridge_loop: "bridge"}
+    closed = {}
+
+    async def close(name):
+        closed[name] = threading.current_thread().name
+
+    await aclose_per_loop(resources, close)
+
+    assert closed == {"api": threading.current_thread().name, "bridge": "mera-sync-runner"}
+    assert not resources
@@ -0,0 +1,21 @@
+"""Tests for the bounded TTL cache."""
+
+from app.ttlcache import TTLCache
+
+
+def test_evicts_least_recently_used_and_expires():
+    """Entries are LRU-bounded and dropped after their TTL."""
+    now = [100.0]
+    cache: TTLCache[list] = TTLCache(maxsize=2, ttl=10.0, clock=lambda: now[0])
+    value = ["m"]
+
+    cache.put(("a",), value)
+    cache.put(("b",), value)
+    cache.get(("a",))
+    cache.put(("c",), value)
+    assert cache.get(("b",)) is None
+    assert cache.get(("a",)) is value
+
+    now[0] += 11.0
+    assert cache.get(("a",)) is None
+    assert len(cache) == 1